@@ -7,10 +7,9 @@ import uuid
 import logging
 from pathlib import Path
 from typing import Optional
+from urllib.parse import quote
 from fastapi import APIRouter, HTTPException, Response, Depends, Request
-from fastapi.responses import FileResponse, JSONResponse
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from fastapi.responses import FileResponse
 
 from app.core.config import settings
 from app.core.cleanup import get_directory_stats, cleanup_all_directories
@@ -20,9 +19,6 @@ from app.core.auth import verify_api_key
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Initialize limiter for this module
-limiter = Limiter(key_func=get_remote_address) if settings.ENABLE_RATE_LIMITING else None
-
 
 def _validate_uuid(value: str, param_name: str = "identifier") -> None:
     """
@@ -81,7 +77,6 @@ def _ensure_path_within_directory(file_path: Path, allowed_dir: Path) -> None:
         )
 
 
-@limiter.limit(settings.RATE_LIMIT_LIGHT_OPERATIONS) if limiter else lambda f: f
 @router.get(
     "/download/{file_id}",
     summary="Download converted audio file",
@@ -122,11 +117,7 @@ async def download_file(request: Request, file_id: str):
         # Determine content type based on file extension
         content_type = _get_content_type(file_path.suffix)
 
-        return FileResponse(
-            path=str(file_path),
-            filename=file_path.name,
-            media_type=content_type
-        )
+        return _file_response(file_path, file_path.name, content_type)
 
     except HTTPException:
         raise
@@ -138,7 +129,6 @@ async def download_file(request: Request, file_id: str):
         )
 
 
-@limiter.limit(settings.RATE_LIMIT_LIGHT_OPERATIONS) if limiter else lambda f: f
 @router.get(
     "/download/{job_id}/{filename}",
     summary="Download specific stem file",
@@ -176,11 +166,7 @@ async def download_stem_file(request: Request, job_id: str, filename: str):
         # Determine content type
         content_type = _get_content_type(file_path.suffix)
 
-        return FileResponse(
-            path=str(file_path),
-            filename=filename,
-            media_type=content_type
-        )
+        return _file_response(file_path, filename, content_type)
 
     except HTTPException:
         raise
@@ -192,7 +178,6 @@ async def download_stem_file(request: Request, job_id: str, filename: str):
         )
 
 
-@limiter.limit(settings.RATE_LIMIT_INFO_OPERATIONS) if limiter else lambda f: f
 @router.get(
     "/download/{file_id}/info",
     response_model=DownloadInfo,
@@ -248,7 +233,6 @@ async def get_file_info(request: Request, file_id: str) -> DownloadInfo:
         )
 
 
-@limiter.limit(settings.RATE_LIMIT_INFO_OPERATIONS) if limiter else lambda f: f
 @router.get(
     "/stats",
     response_model=StatsResponse,
@@ -326,6 +310,39 @@ async def manual_cleanup():
         )
 
 
+def _file_response(file_path: Path, filename: str, content_type: str) -> Response:
+    """
+    Build the download response for a validated file under OUTPUT_DIR
+
+    Behind nginx (ACCEL_REDIRECT_PREFIX set) only headers are returned and
+    nginx sends the file itself; otherwise FileResponse streams it.
+
+    Args:
+        file_path: File to send, already checked to be within OUTPUT_DIR
+        filename: Download filename for Content-Disposition
+        content_type: MIME type of the file
+
+    Returns:
+        Response for the download route
+    """
+    prefix = settings.ACCEL_REDIRECT_PREFIX
+    if not prefix:
+        return FileResponse(
+            path=str(file_path),
+            filename=filename,
+            media_type=content_type
+        )
+
+    relative = file_path.resolve().relative_to(settings.OUTPUT_DIR.resolve()).as_posix()
+    return Response(
+        media_type=content_type,
+        headers={
+            "X-Accel-Redirect": prefix.rstrip("/") + "/" + quote(relative),
+            "Content-Disposition": f"attachment; filename*=utf-8''{quote(filename)}"
+        }
+    )
+
+
 def _get_content_type(file_extension: str) -> str:
     """Get MIME content type for file extension"""
     content_types = {
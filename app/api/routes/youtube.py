@@ -6,12 +6,9 @@ import logging
 import re
 from urllib.parse import urlparse
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Request
-from fastapi.responses import JSONResponse
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 
-from app.models.requests import YouTubeToMP3Request
-from app.models.responses import YouTubeToMP3Response, ErrorResponse
+from app.models.requests import YouTubeToMP3Request, YouTubeBatchRequest
+from app.models.responses import YouTubeToMP3Response, YouTubeBatchResponse, ErrorResponse
 from app.services.youtube_service import YouTubeService
 from app.core.auth import verify_api_key
 from app.core.config import settings
@@ -21,9 +18,6 @@ from app.core.metrics import MetricsContext
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Initialize limiter for this module
-limiter = Limiter(key_func=get_remote_address) if settings.ENABLE_RATE_LIMITING else None
-
 
 def validate_youtube_url(url: str) -> bool:
     """
@@ -99,7 +93,39 @@ async def _schedule_file_cleanup(file_path: str, delay_hours: int):
         logger.warning(f"Background cleanup failed for file: {file_path}")
 
 
-@(limiter.limit(settings.RATE_LIMIT_HEAVY_OPERATIONS) if limiter else (lambda f: f))
+def _build_download_response(result: dict, background_tasks: BackgroundTasks) -> YouTubeToMP3Response:
+    """
+    Convert a YouTubeService download result into an API response
+    
+    Also schedules cleanup of the downloaded file after the retention period.
+    """
+    if not result['success']:
+        return YouTubeToMP3Response(
+            success=False,
+            error=result.get('error', 'Unknown error occurred')
+        )
+    
+    # Generate download URL
+    download_url = f"/api/v1/download/{result['file_id']}"
+    
+    # Schedule cleanup of downloaded file after retention period
+    background_tasks.add_task(
+        _schedule_file_cleanup, 
+        result['file_path'],
+        settings.FILE_RETENTION_HOURS
+    )
+    
+    return YouTubeToMP3Response(
+        success=True,
+        message="Audio downloaded and converted successfully",
+        file_id=result['file_id'],
+        filename=result['filename'],
+        file_size_mb=result['file_size_mb'],
+        metadata=result.get('metadata'),
+        download_url=download_url
+    )
+
+
 @router.post(
     "/youtube-to-mp3",
     response_model=YouTubeToMP3Response,
@@ -112,7 +138,7 @@ async def _schedule_file_cleanup(file_path: str, delay_hours: int):
     - 5: Balanced quality (~160 kbps, medium files)
     - 10: Smallest files (~64 kbps, lower quality)
 
-    **Supported Formats:** mp3, m4a, wav, flac, aac, opus
+    **Supported Formats:** mp3, m4a, wav, flac, aac, opus, copy (no re-encode)
     
     **Authentication:** Requires valid API key when authentication is enabled.
     """,
@@ -145,41 +171,87 @@ async def youtube_to_mp3(
 
         # Download the audio with metrics tracking
         with MetricsContext("youtube_download"):
-            result = youtube_service.download_audio(
+            result = await youtube_service.download_audio(
                 url=str(youtube_request.url),
                 audio_quality=youtube_request.audio_quality,
                 audio_format=youtube_request.audio_format,
                 extract_metadata=youtube_request.extract_metadata
             )
         
-        if not result['success']:
-            return YouTubeToMP3Response(
-                success=False,
-                error=result.get('error', 'Unknown error occurred')
-            )
-        
-        # Generate download URL
-        download_url = f"/api/v1/download/{result['file_id']}"
+        return _build_download_response(result, background_tasks)
         
-        # Schedule cleanup of downloaded file after retention period
-        background_tasks.add_task(
-            _schedule_file_cleanup, 
-            result['file_path'],
-            settings.FILE_RETENTION_HOURS
+    except Exception as e:
+        logger.error(f"Error in youtube_to_mp3: {type(e).__name__}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="Internal server error"
         )
+
+
+@router.post(
+    "/youtube-to-mp3/batch",
+    response_model=YouTubeBatchResponse,
+    summary="Convert several YouTube videos to MP3 in parallel",
+    description="""
+    Download and convert up to `MAX_BATCH_URLS` YouTube videos in one request.
+    Each URL is downloaded in its own worker process, so the batch finishes in
+    roughly the time of the slowest video instead of the sum of all of them.
+
+    Results are returned in the same order as `urls`; a failed URL yields an
+    entry with `success: false` without failing the rest of the batch.
+
+    **Authentication:** Requires valid API key when authentication is enabled.
+    """,
+    dependencies=[Depends(verify_api_key)]
+)
+async def youtube_to_mp3_batch(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    batch_request: YouTubeBatchRequest
+) -> YouTubeBatchResponse:
+    """
+    Convert several YouTube videos to MP3
+    
+    - **urls**: YouTube video URLs (required)
+    - **audio_quality**: Audio quality from 0 (best) to 10 (worst)
+    - **audio_format**: Output audio format (mp3, m4a, wav, flac, etc.)
+    - **extract_metadata**: Whether to extract video metadata
+    
+    Returns one conversion result per URL.
+    """
+    try:
+        urls = [str(url) for url in batch_request.urls]
+        invalid_urls = [url for url in urls if not validate_youtube_url(url)]
+        if invalid_urls:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid YouTube URL"
+            )
+
+        youtube_service = YouTubeService()
+
+        # Download the audio with metrics tracking
+        with MetricsContext("youtube_batch_download"):
+            results = await youtube_service.download_audio_batch(
+                urls=urls,
+                audio_quality=batch_request.audio_quality,
+                audio_format=batch_request.audio_format,
+                extract_metadata=batch_request.extract_metadata
+            )
         
-        return YouTubeToMP3Response(
-            success=True,
-            message="Audio downloaded and converted successfully",
-            file_id=result['file_id'],
-            filename=result['filename'],
-            file_size_mb=result['file_size_mb'],
-            metadata=result.get('metadata'),
-            download_url=download_url
+        responses = [_build_download_response(result, background_tasks) for result in results]
+        succeeded = sum(1 for response in responses if response.success)
+        
+        return YouTubeBatchResponse(
+            success=succeeded > 0,
+            message=f"{succeeded}/{len(responses)} videos downloaded and converted successfully",
+            results=responses
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error in youtube_to_mp3: {type(e).__name__}", exc_info=True)
+        logger.error(f"Error in youtube_to_mp3_batch: {type(e).__name__}", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail="Internal server error"
@@ -192,11 +264,12 @@ async def youtube_to_mp3(
     description="Extract metadata from a YouTube video without downloading. Requires authentication when enabled.",
     dependencies=[Depends(verify_api_key)]
 )
-async def get_youtube_info(url: str):
+async def get_youtube_info(url: str, refresh: bool = False):
     """
     Get YouTube video information without downloading
     
     - **url**: YouTube video URL
+    - **refresh**: Bypass the per-video info cache
     
     Returns video metadata including title, duration, thumbnail, etc.
     """
@@ -208,29 +281,9 @@ async def get_youtube_info(url: str):
                 detail="Invalid YouTube URL"
             )
 
-        import yt_dlp
-
-        with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
-            info = ydl.extract_info(url, download=False)
-            
-            return {
-                "success": True,
-                "info": {
-                    "title": info.get('title'),
-                    "duration": info.get('duration'),
-                    "thumbnail": info.get('thumbnail'),
-                    "uploader": info.get('uploader'),
-                    "upload_date": info.get('upload_date'),
-                    "view_count": info.get('view_count'),
-                    "description": info.get('description', '')[:500] if info.get('description') else None,
-                    "formats_available": len(info.get('formats', [])),
-                    "audio_formats": [
-                        f for f in info.get('formats', []) 
-                        if f.get('acodec') != 'none' and f.get('vcodec') == 'none'
-                    ][:5]  # Show first 5 audio formats
-                }
-            }
-            
+        info = await YouTubeService().get_video_info(url, refresh=refresh)
+        return {"success": True, "info": info}
+
     except Exception as e:
         logger.error(f"Error getting YouTube info: {type(e).__name__}", exc_info=True)
         raise HTTPException(
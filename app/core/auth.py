@@ -2,9 +2,11 @@
 Authentication and authorization utilities
 """
 
+import time
+import asyncio
 import logging
 import hashlib
-from typing import Optional
+from typing import List, Optional
 from fastapi import HTTPException, Header, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
@@ -13,6 +15,14 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 security = HTTPBearer(auto_error=False)
 
+# Security events are written in batches by a background task
+SECURITY_LOG_QUEUE_SIZE = 10000
+SECURITY_LOG_BATCH_SIZE = 100
+SECURITY_LOG_FLUSH_SECONDS = 0.1
+
+_security_queue: Optional[asyncio.Queue] = None
+_dropped_security_events = 0
+
 
 class AuthenticationError(HTTPException):
     """Custom authentication error"""
@@ -54,24 +64,92 @@ async def verify_api_key(x_api_key: Optional[str] = Header(None, alias="X-API-Ke
 async def log_security_event(request: Request, event_type: str, details: dict):
     """
     Log security-related events
-    
+
+    The event is queued for the background writer so a burst of failing
+    requests never waits on the log handler; when the queue is full the
+    event is dropped and counted instead.
+
     Args:
         request: FastAPI request object
         event_type: Type of security event
         details: Additional event details
     """
-    security_logger = logging.getLogger("security")
-    
+    global _dropped_security_events
+
     client_ip = getattr(request.client, 'host', 'unknown') if request.client else 'unknown'
     user_agent = request.headers.get("user-agent", "unknown")
-    
-    security_logger.info(
-        "Security event: %s from %s (UA: %s) - %s",
-        event_type,
-        client_ip,
-        user_agent,
-        details
-    )
+    event = (event_type, client_ip, user_agent, details)
+
+    if _security_queue is None:
+        # Writer not running (e.g. outside the app lifespan)
+        _write_security_events([event])
+        return
+    try:
+        _security_queue.put_nowait(event)
+    except asyncio.QueueFull:
+        _dropped_security_events += 1
+
+
+def _write_security_events(events: List[tuple]) -> None:
+    """Emit a batch of queued security events"""
+    global _dropped_security_events
+
+    security_logger = logging.getLogger("security")
+    if _dropped_security_events:
+        security_logger.warning("Dropped %d security events (queue full)", _dropped_security_events)
+        _dropped_security_events = 0
+    for event in events:
+        security_logger.info("Security event: %s from %s (UA: %s) - %s", *event)
+
+
+async def _security_log_writer(queue: asyncio.Queue) -> None:
+    """Drain the queue, writing up to SECURITY_LOG_BATCH_SIZE events at a time"""
+    while True:
+        batch = [await queue.get()]
+        deadline = time.monotonic() + SECURITY_LOG_FLUSH_SECONDS
+        while len(batch) < SECURITY_LOG_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        try:
+            _write_security_events(batch)
+        except Exception as e:
+            logger.error(f"Failed to write security events: {type(e).__name__}")
+
+
+def start_security_log_writer() -> asyncio.Task:
+    """
+    Start the background security event writer
+
+    Returns:
+        The writer task; pass it to `stop_security_log_writer` on shutdown
+    """
+    global _security_queue
+
+    _security_queue = asyncio.Queue(maxsize=SECURITY_LOG_QUEUE_SIZE)
+    return asyncio.create_task(_security_log_writer(_security_queue))
+
+
+async def stop_security_log_writer(task: asyncio.Task) -> None:
+    """Stop the writer and flush any events still queued"""
+    global _security_queue
+
+    queue, _security_queue = _security_queue, None
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    if queue is not None:
+        pending = []
+        while not queue.empty():
+            pending.append(queue.get_nowait())
+        if pending or _dropped_security_events:
+            _write_security_events(pending)
 
 
 async def get_client_identifier(request: Request) -> str:
@@ -81,16 +159,35 @@ async def get_client_identifier(request: Request) -> str:
     Args:
         request: FastAPI request object
 
+    Returns:
+        str: Client identifier (IP or hashed API key)
+    """
+    return client_identifier_from_scope(request.scope)
+
+
+def client_identifier_from_scope(scope: dict) -> str:
+    """
+    Same as `get_client_identifier`, read straight from an ASGI scope
+
+    Used by the middleware so rate limiting doesn't build a Request. Behind
+    a reverse proxy, `scope["client"]` is the real client only when uvicorn
+    runs with proxy headers from a trusted peer (FORWARDED_ALLOW_IPS);
+    otherwise every client shares the proxy's bucket.
+
+    Args:
+        scope: ASGI HTTP connection scope
+
     Returns:
         str: Client identifier (IP or hashed API key)
     """
     # If using API key, use a hash of the key as identifier
-    api_key = request.headers.get("X-API-Key")
-    if api_key and settings.REQUIRE_API_KEY:
-        # Use SHA256 hash of the full key for rate limiting
-        key_hash = hashlib.sha256(api_key.encode()).hexdigest()[:16]
-        return f"api_key:{key_hash}"
+    if settings.REQUIRE_API_KEY:
+        for name, value in scope["headers"]:
+            if name == b"x-api-key":
+                # Use SHA256 hash of the full key for rate limiting
+                key_hash = hashlib.sha256(value).hexdigest()[:16]
+                return f"api_key:{key_hash}"
 
     # Fallback to IP address
-    client_ip = getattr(request.client, 'host', 'unknown') if request.client else 'unknown'
-    return f"ip:{client_ip}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
@@ -5,8 +5,8 @@ File cleanup utilities for managing temporary files and old downloads
 import os
 import time
 import atexit
+import asyncio
 import logging
-import threading
 from pathlib import Path
 from typing import List, Optional
 from contextlib import asynccontextmanager
@@ -76,7 +76,8 @@ def cleanup_all_directories() -> dict:
     directories_to_clean = [
         (settings.UPLOAD_DIR, "uploads"),
         (settings.OUTPUT_DIR, "outputs"), 
-        (settings.TEMP_DIR, "temp")
+        (settings.TEMP_DIR, "temp"),
+        (settings.PARTIALS_DIR, "partials")
     ]
     
     for directory, name in directories_to_clean:
@@ -99,26 +100,32 @@ def cleanup_all_directories() -> dict:
     return results
 
 
-def periodic_cleanup():
-    """Run periodic cleanup in background thread"""
+async def periodic_cleanup():
+    """Run cleanup every CLEANUP_INTERVAL_HOURS; the filesystem work runs in the executor"""
+    loop = asyncio.get_event_loop()
     while True:
         try:
             logger.info("Starting periodic cleanup...")
-            results = cleanup_all_directories()
+            results = await loop.run_in_executor(None, cleanup_all_directories)
             total_removed = sum(r.get("removed_files", 0) for r in results.values())
             logger.info(f"Periodic cleanup completed. Removed {total_removed} files total.")
         except Exception as e:
             logger.error(f"Error in periodic cleanup: {e}")
         
         # Sleep for configured interval
-        time.sleep(settings.CLEANUP_INTERVAL_HOURS * 3600)
+        await asyncio.sleep(settings.CLEANUP_INTERVAL_HOURS * 3600)
 
 
-def start_cleanup_scheduler():
-    """Start the background cleanup scheduler"""
-    cleanup_thread = threading.Thread(target=periodic_cleanup, daemon=True)
-    cleanup_thread.start()
+def start_cleanup_scheduler() -> asyncio.Task:
+    """
+    Start the background cleanup scheduler on the running event loop
+
+    Returns:
+        The scheduler task; cancel it on shutdown
+    """
+    task = asyncio.create_task(periodic_cleanup())
     logger.info(f"Started cleanup scheduler (interval: {settings.CLEANUP_INTERVAL_HOURS}h)")
+    return task
 
 
 def get_directory_stats(directory: Path) -> dict:
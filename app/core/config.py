@@ -14,12 +14,19 @@ class Settings(BaseSettings):
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     DEBUG: bool = False
+    # Worker processes; caches, semaphores and download pools are per process.
+    # 0 = WEB_CONCURRENCY if set, else one per CPU
+    UVICORN_WORKERS: int = 1
+    # Proxies whose X-Forwarded-For/X-Real-IP uvicorn trusts for the client IP
+    # (rate limits key on it); comma-separated IPs/CIDRs, "*" trusts any peer
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
     
     # File Storage
     BASE_DIR: Path = Path(__file__).parent.parent.parent
     UPLOAD_DIR: Path = BASE_DIR / "uploads"
     OUTPUT_DIR: Path = BASE_DIR / "outputs"
     TEMP_DIR: Path = BASE_DIR / "temp"
+    PARTIALS_DIR: Path = BASE_DIR / "partials"  # yt-dlp partial downloads; not served, keep on OUTPUT_DIR's filesystem
     
     # File Limits
     MAX_FILE_SIZE_MB: int = 100
@@ -32,6 +39,7 @@ class Settings(BaseSettings):
     STREAMING_CHUNK_SIZE: int = 8192  # 8KB chunks for streaming uploads
     PROCESS_MEMORY_LIMIT_MB: int = 4096  # 4GB limit for subprocess operations
     MEMORY_CHECK_INTERVAL: int = 10  # Check memory every 10 seconds during processing
+    HEALTH_SAMPLE_INTERVAL: int = 5  # Seconds between background disk/memory/Redis samples for /health
     
     # File Upload Validation
     ALLOWED_AUDIO_EXTENSIONS: list = [".mp3", ".wav", ".flac", ".m4a", ".aac", ".ogg", ".opus", ".wma"]
@@ -55,8 +63,16 @@ class Settings(BaseSettings):
     # YouTube Download Settings
     DEFAULT_AUDIO_QUALITY: int = 0  # 0 = best, 10 = worst
     DEFAULT_AUDIO_FORMAT: str = "mp3"
-    SUPPORTED_AUDIO_FORMATS: list = ["mp3", "m4a", "wav", "flac", "aac", "opus"]
+    SUPPORTED_AUDIO_FORMATS: list = ["mp3", "m4a", "wav", "flac", "aac", "opus", "copy"]  # copy = keep source codec
     YOUTUBE_COOKIES_FILE: str = ""  # Optional: Path to cookies file for YouTube authentication
+    YOUTUBE_PREFER_FAST_ENCODERS: bool = True  # Use aac_at/libfdk_aac for AAC output when ffmpeg has them
+    YOUTUBE_PLAYER_CLIENTS: str = ""  # Optional: comma-separated yt-dlp player clients (e.g. "mediaconnect")
+    MAX_CONCURRENT_DOWNLOADS: int = 4  # Concurrent yt-dlp downloads per worker
+    MAX_PARALLEL_DOWNLOADS: int = 4  # Batch download pool processes per API worker (x UVICORN_WORKERS in total)
+    MAX_BATCH_URLS: int = 20  # URLs accepted per batch download request
+    YOUTUBE_METADATA_CACHE_SIZE: int = 2000  # Max videos cached for /youtube-info (0 disables the cache)
+    YOUTUBE_METADATA_CACHE_TTL_SECONDS: int = 3600  # Keep below YouTube's ~6h stream URL lifetime
+    YOUTUBE_PARTIAL_DIR_POOL_SIZE: int = 8  # Idle per-download partial dirs kept for reuse
     
     # Demucs Settings
     DEFAULT_DEMUCS_MODEL: str = "htdemucs"
@@ -72,6 +88,15 @@ class Settings(BaseSettings):
     DEMUCS_MODELS_ALLOWLIST: str = ""
     DEFAULT_STEM_FORMAT: str = "mp3"
     SUPPORTED_STEM_FORMATS: list = ["wav", "mp3", "flac"]
+    # Device passed to Demucs ("cpu", "cuda", "cuda:N", "mps"). Empty = Demucs auto-detect.
+    DEMUCS_DEVICE: str = ""
+    # Run Demucs inference in FP16 on CUDA (~2x throughput, half the VRAM).
+    DEMUCS_HALF_PRECISION: bool = False
+    # Write intermediate Demucs stems to tmpfs (/dev/shm) when it has room,
+    # so WAVs never touch the disk. Uses RAM, so it is opt-in.
+    STEM_TEMP_USE_TMPFS: bool = False
+    STEM_TEMP_TMPFS_DIR: Path = Path("/dev/shm/music-tools-stems")
+    STEM_TEMP_TMPFS_MIN_FREE_MB: int = 2048
 
     @property
     def supported_demucs_models_list(self) -> list:
@@ -92,6 +117,7 @@ class Settings(BaseSettings):
     
     # Background Tasks
     REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_MAX_CONNECTIONS: int = 32  # Shared async pool (rate limiting, health checks)
     CELERY_BROKER_URL: str = REDIS_URL
     CELERY_RESULT_BACKEND: str = REDIS_URL
     
@@ -100,14 +126,20 @@ class Settings(BaseSettings):
     REQUIRE_API_KEY: bool = False
     VALID_API_KEYS: str = ""
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:8080"
+    ENABLE_CORS: bool = True  # Disable when a reverse proxy adds Access-Control-* headers
+    
+    # Reverse proxy
+    SERVE_STATIC_FILES: bool = True  # Disable when nginx serves OUTPUT_DIR at /static/
+    ACCEL_REDIRECT_PREFIX: str = ""  # e.g. "/_internal/"; empty = stream downloads from Python
     
     # Rate Limiting
     ENABLE_RATE_LIMITING: bool = True
-    RATE_LIMIT_STORAGE_URI: str = REDIS_URL
+    RATE_LIMIT_STORAGE_URI: str = ""  # Empty = share the REDIS_URL connection pool
     # Rate limits per minute for different operation types
     RATE_LIMIT_HEAVY_OPERATIONS: str = "3/minute"  # Stem separation, YouTube downloads
     RATE_LIMIT_LIGHT_OPERATIONS: str = "20/minute"  # Downloads, models list
     RATE_LIMIT_INFO_OPERATIONS: str = "60/minute"  # Health checks, info endpoints
+    RATE_LIMIT_EXEMPT_PATHS: str = "/health"  # Comma-separated paths never limited (LB/Docker probes)
 
     @property
     def valid_api_keys_list(self) -> list:
@@ -123,6 +155,11 @@ class Settings(BaseSettings):
             return []
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(',') if origin.strip()]
 
+    @property
+    def rate_limit_exempt_paths_list(self) -> list:
+        """Parse comma-separated rate limit exempt paths into a list"""
+        return [path.strip() for path in self.RATE_LIMIT_EXEMPT_PATHS.split(',') if path.strip()]
+
     # Logging
     LOG_LEVEL: str = "INFO"
 
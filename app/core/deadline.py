@@ -0,0 +1,23 @@
+"""
+Per-request deadline shared by the timeout middleware and long-running services
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+# time.monotonic() value after which the middleware answers 504
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def time_remaining() -> Optional[float]:
+    """
+    Seconds left before the current request's deadline
+
+    Returns:
+        Remaining seconds (may be negative), or None outside a request
+    """
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
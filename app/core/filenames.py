@@ -0,0 +1,32 @@
+"""
+Filename-safe versions of user-visible titles (stdlib only)
+"""
+
+import functools
+
+# Characters kept in title-based filenames besides alphanumerics
+SAFE_FILENAME_PUNCTUATION = " -_.()"
+
+# str.translate table dropping every unsafe BMP codepoint
+_SAFE_FILENAME_TABLE = {
+    i: None
+    for i in range(0x10000)
+    if not (chr(i).isalnum() or chr(i) in SAFE_FILENAME_PUNCTUATION)
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def sanitize_title(title: str) -> str:
+    """
+    Strip characters that are unsafe in filenames from a title
+
+    Args:
+        title: Title text (e.g. a YouTube video title)
+
+    Returns:
+        The title with only alphanumerics and SAFE_FILENAME_PUNCTUATION, stripped
+    """
+    if title.isascii() or max(title) < '\U00010000':
+        return title.translate(_SAFE_FILENAME_TABLE).strip()
+    # Non-BMP input (emoji etc.) is outside the table
+    return "".join(c for c in title if c.isalnum() or c in SAFE_FILENAME_PUNCTUATION).strip()
@@ -0,0 +1,23 @@
+"""
+Opaque identifiers for downloads and stem separation jobs
+"""
+
+import os
+
+
+def generate_id() -> str:
+    """
+    Generate a random RFC 4122 version 4 UUID string
+
+    Produces the same canonical 36-character form as str(uuid.uuid4()),
+    so existing clients and the UUID validation on the download routes
+    keep working, but without building a uuid.UUID object per request.
+
+    Returns:
+        Lowercase hyphenated UUID4 string
+    """
+    raw = bytearray(os.urandom(16))
+    raw[6] = (raw[6] & 0x0F) | 0x40  # version 4
+    raw[8] = (raw[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
@@ -4,6 +4,7 @@ Memory management utilities for audio processing operations
 
 import os
 import gc
+import ctypes
 import psutil
 import asyncio
 import threading
@@ -14,13 +15,46 @@ from pathlib import Path
 from typing import Optional, Dict, Any, AsyncGenerator
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor
 import resource
 
 from .config import settings
 
 logger = logging.getLogger(__name__)
 
+# glibc's malloc_trim returns freed heap pages to the OS; None on musl/macOS
+try:
+    _malloc_trim = ctypes.CDLL("libc.so.6").malloc_trim
+except (OSError, AttributeError):
+    _malloc_trim = None
+
+# Concurrent jobs finishing together only need one release pass
+_release_lock = threading.Lock()
+
+
+def release_memory() -> None:
+    """
+    Collect garbage and give freed heap back to the OS (blocking)
+
+    Without malloc_trim the process RSS stays at its high-water mark after
+    a large job, which trips the MEMORY_LIMIT_MB health and admission checks.
+    Returns immediately if another thread is already releasing.
+    """
+    if not _release_lock.acquire(blocking=False):
+        return
+    try:
+        gc.collect()
+        if _malloc_trim is not None:
+            _malloc_trim(0)
+    except Exception as e:
+        logger.warning(f"Failed to release memory: {e}")
+    finally:
+        _release_lock.release()
+
+
+def schedule_memory_release() -> None:
+    """Run `release_memory` in the default executor without waiting for it"""
+    asyncio.get_event_loop().run_in_executor(None, release_memory)
+
 
 @dataclass
 class MemoryStats:
@@ -88,11 +122,8 @@ class MemoryMonitor:
     
     def force_cleanup(self):
         """Force garbage collection and cleanup"""
-        try:
-            gc.collect()
-            logger.debug("Forced garbage collection completed")
-        except Exception as e:
-            logger.error(f"Error during forced cleanup: {e}")
+        release_memory()
+        logger.debug("Forced garbage collection completed")
 
 
 class StreamingFileHandler:
@@ -103,36 +134,46 @@ class StreamingFileHandler:
         """
         Stream uploaded file to temporary file without loading into memory
         
+        The whole copy runs as one job in the default executor, reading the
+        upload's underlying spooled file directly, so neither the reads nor
+        the writes block the event loop.
+        
         Args:
             upload_file: FastAPI UploadFile object
-            chunk_size: Size of chunks to read (default from settings)
+            chunk_size: Size of chunks to copy (default from settings)
             
         Returns:
             Path to temporary file
         """
         if chunk_size is None:
-            chunk_size = settings.STREAMING_CHUNK_SIZE
+            chunk_size = settings.STREAMING_CHUNK_SIZE * 128  # Same chunks as copy_file_chunked
         
         # Create temporary file
         suffix = Path(upload_file.filename or "audio").suffix or ".tmp"
         temp_fd, temp_path = tempfile.mkstemp(suffix=suffix, dir=settings.TEMP_DIR)
+        source = upload_file.file
         
-        try:
+        def _copy() -> int:
             total_size = 0
-            
             with os.fdopen(temp_fd, 'wb') as temp_file:
                 # Stream file contents in chunks
                 while True:
-                    chunk = await upload_file.read(chunk_size)
+                    chunk = source.read(chunk_size)
                     if not chunk:
                         break
                     
-                    temp_file.write(chunk)
                     total_size += len(chunk)
                     
                     # Check file size limit
                     if total_size > settings.MAX_FILE_SIZE_BYTES:
                         raise ValueError(f"File size exceeds limit: {total_size} > {settings.MAX_FILE_SIZE_BYTES}")
+                    
+                    temp_file.write(chunk)
+            return total_size
+        
+        try:
+            loop = asyncio.get_event_loop()
+            total_size = await loop.run_in_executor(None, _copy)
             
             logger.info(f"Streamed upload to temporary file: {temp_path} ({total_size} bytes)")
             return Path(temp_path)
@@ -167,20 +208,30 @@ class ProcessResourceManager:
             logger.warning(f"Failed to set process memory limit: {e}")
     
     def monitor_process(self, process, operation_name: str):
-        """Monitor a subprocess for memory usage"""
+        """
+        Monitor a subprocess for memory usage
+
+        Accepts either a `subprocess.Popen` or an `asyncio.subprocess.Process`.
+        """
+        def _is_running() -> bool:
+            poll = getattr(process, "poll", None)
+            returncode = poll() if poll is not None else process.returncode
+            return returncode is None
+
         def _monitor():
             try:
                 proc = psutil.Process(process.pid)
                 max_memory = 0
                 
-                while process.poll() is None:
+                while _is_running():
                     try:
                         memory_mb = proc.memory_info().rss / 1024 / 1024
                         max_memory = max(max_memory, memory_mb)
                         
                         if memory_mb > settings.PROCESS_MEMORY_LIMIT_MB:
                             logger.error(f"Process {operation_name} exceeded memory limit: {memory_mb}MB")
-                            process.terminate()
+                            # Signal by PID so this is safe from the monitor thread
+                            proc.terminate()
                             break
                         
                         time.sleep(settings.MEMORY_CHECK_INTERVAL)
@@ -233,9 +284,9 @@ class ConcurrentOperationLimiter:
             async with self.operation_lock:
                 self.active_operations -= 1
                 logger.info(f"Completed operation {operation_name} ({self.active_operations}/{settings.MAX_CONCURRENT_OPERATIONS} active)")
-                
-                # Force cleanup after heavy operation
-                gc.collect()
+            
+            # Force cleanup after heavy operation, off the event loop
+            schedule_memory_release()
 
 
 class MemoryEfficientProcessor:
@@ -264,10 +315,9 @@ class MemoryEfficientProcessor:
                         break
                     dst.write(chunk)
         
-        # Run in thread pool to avoid blocking event loop
+        # Run in the default executor to avoid blocking the event loop
         loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            await loop.run_in_executor(executor, _copy)
+        await loop.run_in_executor(None, _copy)
     
     @staticmethod
     def estimate_processing_memory(file_size_bytes: int, operation_type: str) -> int:
@@ -2,6 +2,7 @@
 Prometheus metrics collection for Music Tools API
 """
 
+import os
 import time
 import logging
 from typing import Optional
@@ -38,7 +39,8 @@ def init_metrics():
         MEMORY_USAGE = Gauge(
             'api_memory_usage_bytes',
             'Current memory usage in bytes',
-            ['type']  # system, process
+            ['type'],  # system, process
+            multiprocess_mode='max'
         )
         
         PROCESSING_TIME = Histogram(
@@ -56,7 +58,8 @@ def init_metrics():
         ACTIVE_OPERATIONS = Gauge(
             'api_active_operations',
             'Currently active operations',
-            ['operation_type']
+            ['operation_type'],
+            multiprocess_mode='livesum'
         )
         
         logger.info("Prometheus metrics initialized successfully")
@@ -175,4 +178,50 @@ class MetricsContext:
 
 def metrics_available() -> bool:
     """Check if metrics are available"""
-    return REQUEST_COUNT is not None
\ No newline at end of file
+    return REQUEST_COUNT is not None
+
+
+# Serialized exposition output, reused for scrapes within METRICS_CACHE_TTL seconds
+METRICS_CACHE_TTL = 1.0
+_metrics_cache = {"t": 0.0, "data": None}
+
+
+def get_cached_metrics() -> Optional[bytes]:
+    """Return the last serialized metrics if still fresh, else None"""
+    if _metrics_cache["data"] is not None and time.monotonic() - _metrics_cache["t"] <= METRICS_CACHE_TTL:
+        return _metrics_cache["data"]
+    return None
+
+
+def mark_metrics_process_dead() -> None:
+    """
+    Drop this worker's live gauge samples from the multiprocess aggregate
+
+    Call on shutdown; otherwise `livesum` gauges such as
+    api_active_operations keep counting an exited worker's last values.
+    """
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(os.getpid())
+
+
+def refresh_metrics_cache() -> bytes:
+    """Serialize all collectors with generate_latest() and cache the result (blocking)"""
+    from prometheus_client import generate_latest
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Several workers: aggregate every process's samples, not just this one's
+        from prometheus_client import CollectorRegistry, multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        data = generate_latest(registry)
+    else:
+        data = generate_latest()
+    _metrics_cache["data"] = data
+    _metrics_cache["t"] = time.monotonic()
+    return data
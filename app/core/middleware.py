@@ -0,0 +1,199 @@
+"""
+Single pure-ASGI middleware for request metrics, rate limiting, timeouts and security logging
+"""
+
+import time
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi.responses import ORJSONResponse
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.deadline import request_deadline
+from app.core.auth import log_security_event, client_identifier_from_scope
+from app.core.metrics import record_request
+from app.core.ratelimit import rate_limiter, rate_limit_for_path
+
+logger = logging.getLogger(__name__)
+
+
+def _url_from_scope(scope: Scope) -> str:
+    """Rebuild the request URL for log messages (failure paths only)"""
+    host = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"host"), "")
+    query = scope.get("query_string", b"")
+    url = f"{scope.get('scheme', 'http')}://{host}{scope['path']}"
+    return f"{url}?{query.decode('latin-1')}" if query else url
+
+
+class UnifiedMiddleware:
+    """
+    Everything the API does around a request, in one ASGI layer
+
+    Replaces the separate metrics, security-logging, bad-request-logging,
+    timeout and rate-limit `@app.middleware("http")` functions, each of
+    which was a BaseHTTPMiddleware with its own task and stream bridge.
+    """
+
+    def __init__(self, app: ASGIApp, settings):
+        self.app = app
+        self.settings = settings
+        # Endpoint -> timeout; anything else gets API_REQUEST_TIMEOUT
+        self.timeouts = {
+            "/api/v1/separate-stems": settings.STEM_SEPARATION_TIMEOUT,
+            "/api/v1/youtube-to-mp3": settings.YOUTUBE_DOWNLOAD_TIMEOUT,
+            "/api/v1/youtube-to-mp3/batch": settings.YOUTUBE_DOWNLOAD_TIMEOUT,
+            "/api/v1/youtube-info": settings.YOUTUBE_DOWNLOAD_TIMEOUT,
+            "/health": 30,  # Short timeout for health/info endpoints
+            "/api/v1/stats": 30,
+        }
+
+    async def _rate_limit_response(self, scope: Scope) -> Optional[ORJSONResponse]:
+        """Return a 429 response if this request exceeds its route's limit"""
+        bucket = rate_limit_for_path(scope["path"])
+        if bucket is None:
+            return None
+
+        name, rate = bucket
+        client_id = client_identifier_from_scope(scope)
+        admitted, retry_after_ms = await rate_limiter.hit(f"rl:{client_id}:{name}", rate)
+        if admitted:
+            return None
+
+        retry_after = max(1, -(-retry_after_ms // 1000))
+        return ORJSONResponse(
+            status_code=429,
+            content={
+                "success": False,
+                "error": f"Rate limit exceeded: {rate}",
+                "retry_after_seconds": retry_after
+            },
+            headers={"Retry-After": str(retry_after)}
+        )
+
+    async def _call_with_timeout(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        response_started: asyncio.Event,
+        timeout: int
+    ) -> bool:
+        """
+        Run the app, giving up if it hasn't started responding within `timeout`
+
+        Like the old `wait_for(call_next(...))`, the timeout covers the time
+        to response headers only, so long file downloads aren't cut off.
+        The deadline is also published through `request_deadline`, so
+        services can stop work that task cancellation can't reach
+        (executor threads, subprocesses) instead of leaving it orphaned.
+
+        Returns:
+            False if the request timed out before a response started
+        """
+        # The task copies the current context, deadline included
+        token = request_deadline.set(time.monotonic() + timeout)
+        try:
+            app_task = asyncio.ensure_future(self.app(scope, receive, send))
+        finally:
+            request_deadline.reset(token)
+        started_task = asyncio.ensure_future(response_started.wait())
+        try:
+            done, _ = await asyncio.wait(
+                {app_task, started_task},
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                app_task.cancel()
+                try:
+                    await app_task
+                except asyncio.CancelledError:
+                    pass
+                return False
+            await app_task
+            return True
+        finally:
+            started_task.cancel()
+            if not app_task.done():
+                app_task.cancel()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        method = scope["method"]
+        start_time = time.time()
+        response_started = asyncio.Event()
+        status_code = 500
+        duration = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, duration
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Time to headers, as call_next-based timing measured it
+                duration = time.time() - start_time
+                response_started.set()
+            await send(message)
+
+        try:
+            rejection = None
+            # CORS preflights don't count against the client's limit
+            if self.settings.ENABLE_RATE_LIMITING and method != "OPTIONS":
+                rejection = await self._rate_limit_response(scope)
+
+            if rejection is not None:
+                await rejection(scope, receive, send_wrapper)
+            else:
+                timeout = self.timeouts.get(path, self.settings.API_REQUEST_TIMEOUT)
+                if not await self._call_with_timeout(scope, receive, send_wrapper, response_started, timeout):
+                    logger.warning(f"Request timeout ({timeout}s) for {method} {path}")
+                    response = ORJSONResponse(
+                        status_code=504,
+                        content={
+                            "success": False,
+                            "error": f"Request timeout after {timeout} seconds",
+                            "timeout_seconds": timeout
+                        }
+                    )
+                    await response(scope, receive, send_wrapper)
+        except Exception as e:
+            # Record error metrics and log security-related exceptions
+            record_request(method, path, 500, time.time() - start_time)
+            await log_security_event(
+                Request(scope),
+                "request_error",
+                {"endpoint": _url_from_scope(scope), "error": str(e)}
+            )
+            raise
+
+        record_request(method, path, status_code, duration if duration is not None else time.time() - start_time)
+
+        # Log authentication events
+        if status_code == 401:
+            await log_security_event(
+                Request(scope),
+                "authentication_failure",
+                {"endpoint": _url_from_scope(scope), "method": method}
+            )
+
+        # Log extra context for 400/422 responses to multipart uploads (kept narrow to avoid noise)
+        if path == "/api/v1/separate-stems" and status_code in (400, 422):
+            headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+            logging.getLogger("uvicorn.error").warning(
+                "Bad request to %s %s (status=%s, http=%s, ct=%s, cl=%s, te=%s, origin=%s, ua=%s, xff=%s)",
+                method,
+                path,
+                status_code,
+                scope.get("http_version"),
+                headers.get("content-type"),
+                headers.get("content-length"),
+                headers.get("transfer-encoding"),
+                headers.get("origin"),
+                headers.get("user-agent"),
+                headers.get("x-forwarded-for"),
+            )
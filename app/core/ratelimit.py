@@ -0,0 +1,221 @@
+"""
+Rolling-window rate limiting backed by an atomic Redis Lua script
+"""
+
+import re
+import time
+import logging
+import secrets
+import functools
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Sliding-window log on a sorted set, in one round trip.
+# KEYS[1] = bucket; ARGV = now_ms, window_ms, limit, unique member.
+# Returns {1, 0} when the hit is admitted, {0, retry_after_ms} otherwise.
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+if redis.call('ZCARD', key) < limit then
+    redis.call('ZADD', key, now, ARGV[4])
+    redis.call('PEXPIRE', key, window)
+    return {1, 0}
+end
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+return {0, tonumber(oldest[2]) + window - now}
+"""
+
+RATE_PATTERN = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$", re.IGNORECASE)
+UNIT_MS = {"second": 1000, "minute": 60_000, "hour": 3_600_000, "day": 86_400_000}
+
+# How long to stay on the local fallback after Redis fails
+REDIS_RETRY_SECONDS = 30
+
+
+@functools.lru_cache(maxsize=32)
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """
+    Parse a rate string such as "3/minute" or "100 per 1 hour"
+
+    Args:
+        rate: Rate limit string (same syntax as the RATE_LIMIT_* settings)
+
+    Returns:
+        Tuple of (max hits, window in milliseconds)
+
+    Raises:
+        ValueError: If the string is not a valid rate, or its limit or
+            window is zero
+    """
+    match = RATE_PATTERN.match(rate)
+    if not match:
+        raise ValueError(f"Invalid rate limit: {rate!r}")
+    limit, multiplier, unit = match.groups()
+    limit, multiplier = int(limit), int(multiplier or 1)
+    # Both backends assume at least one hit fits in a non-empty window
+    if limit < 1 or multiplier < 1:
+        raise ValueError(f"Invalid rate limit: {rate!r} (limit and window must be at least 1)")
+    return limit, multiplier * UNIT_MS[unit.lower()]
+
+
+def configured_rates() -> Dict[str, str]:
+    """The RATE_LIMIT_* settings, by setting name"""
+    return {
+        "RATE_LIMIT_HEAVY_OPERATIONS": settings.RATE_LIMIT_HEAVY_OPERATIONS,
+        "RATE_LIMIT_LIGHT_OPERATIONS": settings.RATE_LIMIT_LIGHT_OPERATIONS,
+        "RATE_LIMIT_INFO_OPERATIONS": settings.RATE_LIMIT_INFO_OPERATIONS,
+    }
+
+
+def validate_rate_limits() -> None:
+    """
+    Check every RATE_LIMIT_* setting parses, so a bad value fails startup
+    instead of turning each limited request into a 500
+
+    Raises:
+        ValueError: If a setting is not a single "N/unit" rate with N >= 1
+    """
+    for name, rate in configured_rates().items():
+        try:
+            parse_rate(rate)
+        except ValueError:
+            raise ValueError(
+                f"{name}={rate!r} is not a valid rate limit; "
+                "use a single limit of at least 1, such as \"3/minute\" or \"100 per 1 hour\"; "
+                "turn limiting off with ENABLE_RATE_LIMITING=false"
+            ) from None
+
+
+@functools.lru_cache(maxsize=1)
+def _fixed_path_limits() -> Dict[str, Optional[Tuple[str, str]]]:
+    """Exact-path buckets, built once from settings (None = exempt)"""
+    limits = {
+        path: (path.rsplit("/api/v1/", 1)[1], settings.RATE_LIMIT_HEAVY_OPERATIONS)
+        for path in ("/api/v1/separate-stems", "/api/v1/youtube-to-mp3", "/api/v1/youtube-to-mp3/batch")
+    }
+    for path in ("/", "/health", "/api/v1/stats", "/api/v1/models"):
+        limits[path] = (path.strip("/") or "root", settings.RATE_LIMIT_INFO_OPERATIONS)
+    for path in settings.rate_limit_exempt_paths_list:
+        limits[path] = None
+    return limits
+
+
+def rate_limit_for_path(path: str) -> Optional[Tuple[str, str]]:
+    """
+    Map a request path to its rate limit bucket
+
+    Args:
+        path: Request URL path
+
+    Returns:
+        Tuple of (bucket name, rate string), or None if the path is not limited
+    """
+    fixed = _fixed_path_limits()
+    if path in fixed:
+        return fixed[path]
+    if path.startswith("/api/v1/download/"):
+        if path.endswith("/info"):
+            return "download-info", settings.RATE_LIMIT_INFO_OPERATIONS
+        return "download", settings.RATE_LIMIT_LIGHT_OPERATIONS
+    return None
+
+
+class LocalSlidingWindow:
+    """In-process sliding-window log, used when Redis is unreachable"""
+
+    def __init__(self):
+        self._hits: Dict[str, Deque[int]] = {}
+
+    def hit(self, key: str, now_ms: int, window_ms: int, limit: int) -> Tuple[bool, int]:
+        """Same contract as the Lua script: (admitted, retry_after_ms)"""
+        hits = self._hits.setdefault(key, deque())
+        while hits and hits[0] <= now_ms - window_ms:
+            hits.popleft()
+        if len(hits) < limit:
+            hits.append(now_ms)
+            return True, 0
+        return False, hits[0] + window_ms - now_ms
+
+    def prune(self, now_ms: int, max_window_ms: int) -> None:
+        """Drop buckets with no hits inside the longest window"""
+        stale = [key for key, hits in self._hits.items() if not hits or hits[-1] <= now_ms - max_window_ms]
+        for key in stale:
+            del self._hits[key]
+
+
+class RateLimiter:
+    """Rate limiter that runs SLIDING_WINDOW_SCRIPT on Redis with a local fallback"""
+
+    def __init__(self):
+        self._script = None
+        self._local = LocalSlidingWindow()
+        self._redis_retry_at = 0.0
+        self._last_prune = 0.0
+
+    async def connect(self, redis_client) -> None:
+        """
+        Attach a Redis client and preload the script; stays local-only on failure
+
+        Args:
+            redis_client: redis.asyncio.Redis instance, or None for in-process storage
+        """
+        if redis_client is None:
+            logger.info("Rate limiting using in-process storage")
+            return
+        try:
+            self._script = redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+            await redis_client.script_load(SLIDING_WINDOW_SCRIPT)
+            logger.info("Rate limiting enabled with Redis storage")
+        except Exception as e:
+            logger.warning(f"Redis rate limiter unavailable ({type(e).__name__}); using in-process storage")
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+
+    def disconnect(self) -> None:
+        """Stop using Redis; the client itself is owned by the caller"""
+        self._script = None
+
+    async def hit(self, key: str, rate: str) -> Tuple[bool, int]:
+        """
+        Record a hit against `key` if the rate allows it
+
+        Args:
+            key: Bucket key (client + route)
+            rate: Rate string for the bucket
+
+        Returns:
+            Tuple of (admitted, retry_after_ms); retry_after_ms is 0 when admitted
+        """
+        limit, window_ms = parse_rate(rate)
+        now_ms = int(time.time() * 1000)
+
+        if self._script is not None and time.monotonic() >= self._redis_retry_at:
+            try:
+                admitted, retry_after_ms = await self._script(
+                    keys=[key],
+                    args=[now_ms, window_ms, limit, f"{now_ms}-{secrets.token_hex(4)}"],
+                )
+                return bool(admitted), int(retry_after_ms)
+            except Exception as e:
+                logger.warning(
+                    f"Redis rate limiter error ({type(e).__name__}); "
+                    f"using in-process storage for {REDIS_RETRY_SECONDS}s"
+                )
+                self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+
+        # Keep the fallback's memory bounded
+        if time.monotonic() - self._last_prune > 60:
+            longest_window_ms = max(parse_rate(r)[1] for r in configured_rates().values())
+            self._local.prune(now_ms, longest_window_ms)
+            self._last_prune = time.monotonic()
+        return self._local.hit(key, now_ms, window_ms, limit)
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter()
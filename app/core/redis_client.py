@@ -0,0 +1,57 @@
+"""
+Shared connection-pooled async Redis client
+"""
+
+import logging
+from typing import Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Redis sits on the request path (rate limiting, health), so fail fast
+REDIS_CONNECT_TIMEOUT_SECONDS = 0.25
+REDIS_SOCKET_TIMEOUT_SECONDS = 0.5
+REDIS_HEALTH_CHECK_INTERVAL_SECONDS = 30
+
+
+def create_redis_client(url: str):
+    """
+    Create an async Redis client backed by its own connection pool
+
+    No connection is opened until the first command.
+
+    Args:
+        url: Redis connection URL
+
+    Returns:
+        redis.asyncio.Redis instance, or None if the redis package is missing
+        or the URL is not a Redis URL
+    """
+    if not url.startswith(("redis://", "rediss://", "unix://")):
+        return None
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        logger.warning("Redis client not installed; Redis-backed features disabled")
+        return None
+
+    pool = redis.ConnectionPool.from_url(
+        url,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT_SECONDS,
+        socket_timeout=REDIS_SOCKET_TIMEOUT_SECONDS,
+    )
+    return redis.Redis(connection_pool=pool)
+
+
+async def close_redis_client(client: Optional[object]) -> None:
+    """Close a client from `create_redis_client` and disconnect its pool"""
+    if client is None:
+        return
+    try:
+        await client.close()
+        await client.connection_pool.disconnect()
+    except Exception as e:
+        logger.warning(f"Error closing Redis client: {type(e).__name__}")
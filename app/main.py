@@ -0,0 +1,458 @@
+"""
+The FastAPI application: lifespan, middleware, routes, and the root,
+health and metrics endpoints
+
+Served as `main:app`; the top-level main.py loads it on first access.
+"""
+
+import os
+import time
+import shutil
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import orjson
+import psutil
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
+from fastapi.staticfiles import StaticFiles
+
+from app.api.routes import youtube, stems, downloads
+from app.core.config import settings
+from app.core.auth import start_security_log_writer, stop_security_log_writer
+from app.core.cleanup import start_cleanup_scheduler
+from app.core.metrics import (
+    init_metrics, update_memory_metrics, metrics_available, get_cached_metrics, refresh_metrics_cache,
+    mark_metrics_process_dead
+)
+from app.core.middleware import UnifiedMiddleware
+from app.core.ratelimit import rate_limiter, validate_rate_limits
+from app.core.redis_client import create_redis_client, close_redis_client
+from app.services.youtube_service import load_shared_cookiejar, start_download_pool, shutdown_download_pool
+
+logger = logging.getLogger(__name__)
+
+# Reused by the health sampler instead of building a psutil.Process each time
+_PROCESS = psutil.Process()
+
+# Configure security logger
+security_logger = logging.getLogger("security")
+security_handler = logging.StreamHandler()
+security_handler.setFormatter(
+    logging.Formatter("%(asctime)s - SECURITY - %(levelname)s - %(message)s")
+)
+security_logger.addHandler(security_handler)
+security_logger.setLevel(logging.INFO)
+
+# Working directories, checked by name in /health
+WORK_DIRECTORIES = (
+    ("uploads", settings.UPLOAD_DIR),
+    ("outputs", settings.OUTPUT_DIR),
+    ("temp", settings.TEMP_DIR),
+)
+
+# Create them once per process; /health only checks they still exist
+for _, _dir_path in WORK_DIRECTORIES:
+    os.makedirs(_dir_path, exist_ok=True)
+
+
+def _sample_system_health() -> dict:
+    """
+    Sample disk and memory usage for the health check (blocking; run off the event loop)
+
+    Returns:
+        Dict with "disk_space", "memory" and "directories" check entries
+        and the sample time "ts"
+    """
+    checks = {"ts": time.time()}
+    
+    # Check disk space
+    try:
+        total, used, free = shutil.disk_usage(settings.BASE_DIR)
+        free_gb = free / (1024**3)
+        total_gb = total / (1024**3)
+        usage_percent = (used / total) * 100
+        
+        disk_healthy = free_gb > 1.0 and usage_percent < 95  # At least 1GB free and <95% full
+        
+        checks["disk_space"] = {
+            "status": "healthy" if disk_healthy else "unhealthy",
+            "free_gb": round(free_gb, 2),
+            "total_gb": round(total_gb, 2), 
+            "usage_percent": round(usage_percent, 1)
+        }
+    except Exception as e:
+        checks["disk_space"] = {
+            "status": "unhealthy",
+            "error": str(e)
+        }
+    
+    # Check memory usage
+    try:
+        memory = psutil.virtual_memory()
+        process_memory_mb = _PROCESS.memory_info().rss / (1024 * 1024)
+        
+        memory_healthy = (
+            memory.percent < 90 and  # System memory < 90%
+            process_memory_mb < settings.MEMORY_LIMIT_MB  # Process within limits
+        )
+        
+        checks["memory"] = {
+            "status": "healthy" if memory_healthy else "warning",
+            "system_usage_percent": round(memory.percent, 1),
+            "process_memory_mb": round(process_memory_mb, 1),
+            "memory_limit_mb": settings.MEMORY_LIMIT_MB
+        }
+    except Exception as e:
+        checks["memory"] = {
+            "status": "unhealthy",
+            "error": str(e)
+        }
+    
+    # Check directory accessibility
+    checks["directories"] = {}
+    for dir_name, dir_path in WORK_DIRECTORIES:
+        accessible = dir_path.is_dir()
+        checks["directories"][f"{dir_name}_directory"] = {
+            "status": "healthy" if accessible else "unhealthy",
+            "path": str(dir_path),
+            "exists": accessible
+        }
+    
+    return checks
+
+
+async def _check_redis(redis_client) -> dict:
+    """
+    PING the shared Redis pool for the health check
+
+    Returns:
+        The "redis" check entry, plus the sample time "ts"
+    """
+    checked_at = time.time()
+    if redis_client is None:
+        return {
+            "status": "not_available",
+            "message": "Redis client not installed or REDIS_URL is not a Redis URL",
+            "ts": checked_at
+        }
+    try:
+        # A slow Redis shouldn't stall the health check
+        await asyncio.wait_for(redis_client.ping(), timeout=0.25)
+        return {"status": "healthy", "url": settings.REDIS_URL, "ts": checked_at}
+    except Exception as e:
+        return {
+            "status": "unhealthy",
+            "error": str(e) or type(e).__name__,
+            "url": settings.REDIS_URL,
+            "ts": checked_at
+        }
+
+
+async def _refresh_health_stats(app: FastAPI, period: int) -> None:
+    """
+    Keep `app.state.health_cache`, `app.state.redis_health` and the memory
+    gauges fresh off the request path
+
+    /health reads the cached samples, and Prometheus scrapes the last
+    sampled memory values, so neither touches psutil or Redis per request.
+    """
+    loop = asyncio.get_event_loop()
+    while True:
+        try:
+            app.state.health_cache = await loop.run_in_executor(None, _sample_system_health)
+            await loop.run_in_executor(None, update_memory_metrics)
+            if settings.ENABLE_RATE_LIMITING:
+                app.state.redis_health = await _check_redis(app.state.redis)
+        except Exception as e:
+            logger.warning(f"Health sampling failed: {e}")
+        await asyncio.sleep(period)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan manager"""
+    # Startup
+    logger.info("Starting Music Tools API Service...")
+    
+    # Fail fast on rate limits the limiter can't parse
+    if settings.ENABLE_RATE_LIMITING:
+        validate_rate_limits()
+    
+    # Start cleanup scheduler
+    cleanup_task = start_cleanup_scheduler()
+    
+    # Initialize metrics system
+    init_metrics()
+    
+    # Resolve YouTube cookies once instead of on every download
+    app.state.cookiejar = load_shared_cookiejar()
+    
+    # Batch downloads share one process pool for the app's lifetime
+    start_download_pool()
+    
+    # One pooled Redis client shared by the rate limiter and health checks
+    app.state.redis = create_redis_client(settings.REDIS_URL)
+    rate_limit_redis = app.state.redis
+    if settings.RATE_LIMIT_STORAGE_URI and settings.RATE_LIMIT_STORAGE_URI != settings.REDIS_URL:
+        rate_limit_redis = create_redis_client(settings.RATE_LIMIT_STORAGE_URI)
+    
+    # Connect the rate limiter and preload its Lua script
+    if settings.ENABLE_RATE_LIMITING:
+        await rate_limiter.connect(rate_limit_redis)
+    else:
+        logger.info("Rate limiting disabled in configuration")
+    app.state.rate_limiter = rate_limiter
+    
+    # Security events are queued by the middleware and written in batches
+    security_log_task = start_security_log_writer()
+    
+    # Sample disk/memory in the background for /health and the memory gauges
+    app.state.health_cache = None
+    app.state.redis_health = None
+    health_task = asyncio.create_task(_refresh_health_stats(app, settings.HEALTH_SAMPLE_INTERVAL))
+    
+    logger.info(f"API Service started on {settings.API_HOST}:{settings.API_PORT}")
+    yield
+    
+    # Shutdown
+    logger.info("Shutting down Music Tools API Service...")
+    cleanup_task.cancel()
+    health_task.cancel()
+    await asyncio.gather(cleanup_task, health_task, return_exceptions=True)
+    await stop_security_log_writer(security_log_task)
+    shutdown_download_pool()
+    rate_limiter.disconnect()
+    if rate_limit_redis is not app.state.redis:
+        await close_redis_client(rate_limit_redis)
+    await close_redis_client(app.state.redis)
+    mark_metrics_process_dead()
+
+
+# Create FastAPI app
+# Disable documentation endpoints in production (when DEBUG=false)
+docs_url = "/docs" if settings.DEBUG else None
+redoc_url = "/redoc" if settings.DEBUG else None
+openapi_url = "/openapi.json" if settings.DEBUG else None
+
+app = FastAPI(
+    title="Music Tools API",
+    description="""
+    A standalone REST API service for audio processing that provides:
+
+    🎵 **YouTube to MP3 Conversion**
+    - Convert YouTube videos to high-quality MP3 files
+    - Multiple audio format support (mp3, m4a, wav, flac, aac, opus)
+    - Configurable audio quality and metadata extraction
+
+    🎛️ **AI-Powered Audio Stem Separation**
+    - Separate audio into vocals, drums, bass, and other instruments
+    - Multiple Demucs model support for different use cases
+    - GPU acceleration support for faster processing
+
+    📊 **Features**
+    - Real-time progress tracking
+    - Automatic file cleanup
+    - Background task processing
+    - Comprehensive error handling
+    """,
+    version="1.0.0",
+    contact={
+        "name": "Adar Bahar",
+        "url": "https://github.com/AdarBahar/music-tools-api",
+        "email": "adar@bahar.co.il",
+    },
+    license_info={
+        "name": "MIT License",
+        "url": "https://opensource.org/licenses/MIT",
+    },
+    docs_url=docs_url,
+    redoc_url=redoc_url,
+    openapi_url=openapi_url,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+# Metrics, rate limiting, timeouts and security logging in a single ASGI layer
+app.add_middleware(UnifiedMiddleware, settings=settings)
+
+# Add CORS middleware with proper security configuration (skipped when the proxy handles CORS).
+# Added last so it is the outermost layer and 429/504 responses carry CORS headers too.
+if settings.ENABLE_CORS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.allowed_origins_list,  # Specific domains only
+        allow_credentials=False,  # Disable credentials for security
+        allow_methods=["GET", "POST"],  # Only required methods
+        allow_headers=["X-API-Key", "Content-Type"],  # Required headers only
+    )
+
+# Include API routes
+app.include_router(youtube.router, prefix="/api/v1", tags=["YouTube"])
+app.include_router(stems.router, prefix="/api/v1", tags=["Stem Separation"])
+app.include_router(downloads.router, prefix="/api/v1", tags=["Downloads"])
+
+# Mount static files for downloads (nginx serves /static/ itself when behind the proxy)
+if settings.SERVE_STATIC_FILES:
+    app.mount("/static", StaticFiles(directory=settings.OUTPUT_DIR), name="static")
+
+
+# The root payload never changes while the process runs; serialize it once
+_ROOT_INFO = {
+    "name": "Music Tools API",
+    "description": "Standalone audio processing service for YouTube to MP3 conversion and AI-powered stem separation",
+    "version": "1.0.0",
+    "status": "running",
+    "documentation": {
+        "enabled": bool(settings.DEBUG),
+        "swagger_ui": "/docs" if settings.DEBUG else None,
+        "redoc": "/redoc" if settings.DEBUG else None,
+    },
+    "endpoints": {
+        "youtube_to_mp3": "/api/v1/youtube-to-mp3",
+        "youtube_info": "/api/v1/youtube-info",
+        "separate_stems": "/api/v1/separate-stems",
+        "download": "/api/v1/download/{file_id}",
+        "health": "/health",
+        "metrics": "/metrics",
+        "stats": "/api/v1/stats"
+    },
+    "features": [
+        "YouTube to MP3 conversion",
+        "AI-powered audio stem separation",
+        "Multiple audio format support",
+        "Background task processing",
+        "Automatic file cleanup"
+    ]
+}
+_ROOT_PAYLOAD = orjson.dumps(_ROOT_INFO)
+
+
+@app.get("/")
+async def root():
+    """
+    Root endpoint with API information
+
+    Returns basic information about the Music Tools API service including
+    available endpoints and documentation links.
+    """
+    return Response(content=_ROOT_PAYLOAD, media_type="application/json")
+
+
+@app.get("/health")
+async def health_check(request: Request):
+    """
+    Comprehensive health check endpoint
+    
+    Returns detailed health information including:
+    - Service status
+    - Redis connectivity 
+    - Disk space availability
+    - Memory usage
+    - System dependencies
+    """
+    health_status = {
+        "status": "healthy",
+        "service": "music-tools-api",
+        "timestamp": datetime.utcnow(),  # serialized by orjson
+        "version": "1.0.0",
+        "checks": {}
+    }
+    
+    # Check Redis connectivity (only if rate limiting is enabled); the sampler
+    # pings it, so ping inline only if that result is missing or stale
+    if settings.ENABLE_RATE_LIMITING:
+        redis_check = getattr(request.app.state, "redis_health", None)
+        if redis_check is None or time.time() - redis_check["ts"] > 2 * settings.HEALTH_SAMPLE_INTERVAL:
+            redis_check = await _check_redis(getattr(request.app.state, "redis", None))
+            request.app.state.redis_health = redis_check
+        health_status["checks"]["redis"] = {k: v for k, v in redis_check.items() if k != "ts"}
+        if redis_check["status"] == "unhealthy":
+            health_status["status"] = "unhealthy"
+    else:
+        health_status["checks"]["redis"] = {
+            "status": "disabled",
+            "message": "Rate limiting disabled"
+        }
+    
+    # Disk and memory checks come from the background sampler; refresh inline only if it stalled
+    sampled = getattr(request.app.state, "health_cache", None)
+    if sampled is None or time.time() - sampled["ts"] > 2 * settings.HEALTH_SAMPLE_INTERVAL:
+        loop = asyncio.get_event_loop()
+        sampled = await loop.run_in_executor(None, _sample_system_health)
+        request.app.state.health_cache = sampled
+    
+    disk_check = sampled["disk_space"]
+    health_status["checks"]["disk_space"] = disk_check
+    if disk_check["status"] != "healthy":
+        health_status["status"] = "unhealthy"
+    
+    memory_check = sampled["memory"]
+    health_status["checks"]["memory"] = memory_check
+    if memory_check["status"] == "warning":
+        health_status["status"] = "degraded" if health_status["status"] == "healthy" else "unhealthy"
+    elif memory_check["status"] == "unhealthy":
+        health_status["status"] = "unhealthy"
+    
+    for check_name, dir_check in sampled["directories"].items():
+        health_status["checks"][check_name] = dir_check
+        if dir_check["status"] != "healthy":
+            health_status["status"] = "unhealthy"
+    
+    # Return appropriate HTTP status code
+    status_code = {
+        "healthy": 200,
+        "degraded": 200,  # Still operational but with warnings
+        "unhealthy": 503  # Service unavailable
+    }.get(health_status["status"], 503)
+    
+    return ORJSONResponse(health_status, status_code=status_code)
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus metrics endpoint
+    
+    Returns metrics in Prometheus format for monitoring systems.
+    Includes:
+    - Request counts and durations
+    - Memory usage statistics
+    - Processing times for operations
+    - Error counts
+    - Active operation counts
+    """
+    try:
+        from prometheus_client import CONTENT_TYPE_LATEST  # optional dependency
+        
+        if not metrics_available():
+            return Response(
+                content="# Metrics not available - prometheus_client not installed\n",
+                media_type="text/plain"
+            )
+        
+        # Scrapes within the cache TTL reuse the last serialized output
+        metrics_data = get_cached_metrics()
+        if metrics_data is None:
+            loop = asyncio.get_event_loop()
+            metrics_data = await loop.run_in_executor(None, refresh_metrics_cache)
+        
+        return Response(
+            content=metrics_data,
+            media_type=CONTENT_TYPE_LATEST
+        )
+        
+    except ImportError:
+        return Response(
+            content="# Metrics not available - prometheus_client not installed\n", 
+            media_type="text/plain"
+        )
+    except Exception as e:
+        logger.error(f"Error generating metrics: {e}")
+        return Response(
+            content=f"# Error generating metrics: {e}\n",
+            media_type="text/plain"
+        )
@@ -2,11 +2,48 @@
 Pydantic models for API requests
 """
 
-from typing import Optional, List
+from typing import Optional, List, Sequence
 from pydantic import BaseModel, HttpUrl, Field, validator
 
 from app.core.config import settings
 
+# Stems every Demucs model produces, in output order
+VALID_STEMS = ('vocals', 'drums', 'bass', 'other')
+VALID_STEMS_SET = frozenset(VALID_STEMS)
+VALID_STEMS_TEXT = str(list(VALID_STEMS))  # "['vocals', ...]" for error messages
+
+
+def invalid_stems_error(stems: Sequence[str]) -> Optional[str]:
+    """
+    Check requested stems against VALID_STEMS
+
+    Args:
+        stems: Sequence of requested stem names (read twice on failure)
+
+    Returns:
+        Error message naming every invalid stem, or None if all are valid
+    """
+    # Happy path: one C-level containment pass, no allocation
+    if VALID_STEMS_SET.issuperset(stems):
+        return None
+    invalid = set(stems).difference(VALID_STEMS_SET)
+    if len(invalid) == 1:
+        return f"Invalid stem '{invalid.pop()}'. Valid stems: {VALID_STEMS_TEXT}"
+    names = ", ".join(f"'{stem}'" for stem in sorted(invalid))
+    return f"Invalid stems {names}. Valid stems: {VALID_STEMS_TEXT}"
+
+
+def _check_youtube_domain(url):
+    """Raise ValueError unless the URL points at a YouTube domain"""
+    url_str = str(url)
+    youtube_domains = [
+        'youtube.com', 'www.youtube.com', 'm.youtube.com',
+        'youtu.be', 'music.youtube.com'
+    ]
+    if not any(domain in url_str for domain in youtube_domains):
+        raise ValueError("URL must be a valid YouTube URL")
+    return url
+
 
 class YouTubeToMP3Request(BaseModel):
     """Request model for YouTube to MP3 conversion"""
@@ -24,7 +61,7 @@ class YouTubeToMP3Request(BaseModel):
     )
     audio_format: str = Field(
         default=settings.DEFAULT_AUDIO_FORMAT,
-        description="Output audio format: mp3, m4a, wav, flac, aac, opus",
+        description="Output audio format: mp3, m4a, wav, flac, aac, opus, or copy (keep source codec)",
         example="mp3"
     )
     extract_metadata: bool = Field(
@@ -41,13 +78,48 @@ class YouTubeToMP3Request(BaseModel):
     
     @validator('url')
     def validate_youtube_url(cls, v):
-        url_str = str(v)
-        youtube_domains = [
-            'youtube.com', 'www.youtube.com', 'm.youtube.com',
-            'youtu.be', 'music.youtube.com'
-        ]
-        if not any(domain in url_str for domain in youtube_domains):
-            raise ValueError("URL must be a valid YouTube URL")
+        return _check_youtube_domain(v)
+
+
+class YouTubeBatchRequest(BaseModel):
+    """Request model for batch YouTube to MP3 conversion"""
+    
+    urls: List[HttpUrl] = Field(
+        ...,
+        description="YouTube video URLs to convert in parallel",
+        example=["https://www.youtube.com/watch?v=dQw4w9WgXcQ"]
+    )
+    audio_quality: int = Field(
+        default=settings.DEFAULT_AUDIO_QUALITY,
+        ge=0, le=10,
+        description="Audio quality scale: 0=best quality (~320kbps), 5=balanced (~160kbps), 10=smallest files (~64kbps)",
+        example=0
+    )
+    audio_format: str = Field(
+        default=settings.DEFAULT_AUDIO_FORMAT,
+        description="Output audio format: mp3, m4a, wav, flac, aac, opus, or copy (keep source codec)",
+        example="mp3"
+    )
+    extract_metadata: bool = Field(
+        default=True,
+        description="Extract video metadata (title, duration, thumbnail, etc.)",
+        example=True
+    )
+    
+    @validator('audio_format')
+    def validate_audio_format(cls, v):
+        if v not in settings.SUPPORTED_AUDIO_FORMATS:
+            raise ValueError(f"Unsupported audio format. Supported: {settings.SUPPORTED_AUDIO_FORMATS}")
+        return v
+    
+    @validator('urls')
+    def validate_urls(cls, v):
+        if not v:
+            raise ValueError("At least one URL is required")
+        if len(v) > settings.MAX_BATCH_URLS:
+            raise ValueError(f"Too many URLs. Maximum: {settings.MAX_BATCH_URLS}")
+        for url in v:
+            _check_youtube_domain(url)
         return v
 
 
@@ -82,8 +154,7 @@ class StemSeparationRequest(BaseModel):
     @validator('stems')
     def validate_stems(cls, v):
         if v is not None:
-            valid_stems = ['vocals', 'drums', 'bass', 'other']
-            for stem in v:
-                if stem not in valid_stems:
-                    raise ValueError(f"Invalid stem '{stem}'. Valid stems: {valid_stems}")
+            error = invalid_stems_error(v)
+            if error:
+                raise ValueError(error)
         return v
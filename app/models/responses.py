@@ -29,6 +29,14 @@ class YouTubeToMP3Response(BaseModel):
     error: Optional[str] = None
 
 
+class YouTubeBatchResponse(BaseModel):
+    """Response model for batch YouTube to MP3 conversion"""
+    success: bool
+    message: Optional[str] = None
+    results: List[YouTubeToMP3Response] = []
+    error: Optional[str] = None
+
+
 class StemFiles(BaseModel):
     """Model for stem file URLs"""
     vocals: Optional[str] = None
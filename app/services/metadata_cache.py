@@ -0,0 +1,68 @@
+"""
+In-memory TTL + LRU cache for YouTube video info (served by /youtube-info)
+"""
+
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Matches the 11-character video ID in watch, youtu.be and shorts URLs
+VIDEO_ID_PATTERN = re.compile(r"(?:v=|youtu\.be/|shorts/)([\w-]{11})")
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    """Return the YouTube video ID from a URL, or None if it has none"""
+    match = VIDEO_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+class MetadataCache:
+    """Thread-safe cache of video info payloads keyed by video ID"""
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Get cached video info, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry is None:
+                return None
+            stored_at, info = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[video_id]
+                return None
+            self._entries.move_to_end(video_id)
+            return info
+
+    def set(self, video_id: str, info: Dict[str, Any]) -> None:
+        """Store video info, evicting the least recently used entry when full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[video_id] = (time.monotonic(), info)
+            self._entries.move_to_end(video_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global instance
+metadata_cache = MetadataCache(
+    maxsize=settings.YOUTUBE_METADATA_CACHE_SIZE,
+    ttl_seconds=settings.YOUTUBE_METADATA_CACHE_TTL_SECONDS
+)
@@ -3,22 +3,151 @@ Audio stem separation service using Demucs
 """
 
 import os
-import uuid
+import re
 import time
+import asyncio
 import logging
 import tempfile
 import subprocess
 import shutil
+import threading
+from collections import deque
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from app.core.config import settings
+from app.core.deadline import time_remaining
+from app.core.identifiers import generate_id
+from app.models.requests import VALID_STEMS_SET, VALID_STEMS_TEXT
 from app.core.memory_management import (
     memory_monitor, operation_limiter, process_manager, efficient_processor
 )
 
 logger = logging.getLogger(__name__)
 
+# Output formats Demucs can encode itself, with the CLI flags that enable them.
+# Stems in these formats are written directly by Demucs, skipping the
+# intermediate WAV and the ffmpeg re-encode.
+DEMUCS_NATIVE_FORMAT_ARGS = {
+    "mp3": ["--mp3", "--mp3-bitrate", "192"],
+    "flac": ["--flac"],
+}
+
+# Approximate on-disk bytes per second of one stereo 44.1kHz stem, per format.
+STEM_BYTES_PER_SECOND = {
+    "wav": 44100 * 2 * 4,  # float32 PCM (conservative)
+    "mp3": 192 * 1000 // 8,  # 192 kbps CBR
+    "flac": 44100 * 2 * 2 // 2,  # ~50% of 16-bit PCM
+}
+
+# Devices accepted for DEMUCS_DEVICE.
+DEMUCS_DEVICE_PATTERN = re.compile(r"^(cpu|mps|cuda(:\d+)?)$")
+
+# Number of trailing Demucs stderr lines kept for error reporting.
+STDERR_TAIL_LINES = 256
+
+# Subprocess output is captured as bytes; only this much of the end of
+# stderr is decoded when a command fails.
+STDERR_TAIL_BYTES = 4096
+
+
+def _decode_tail(data: Optional[bytes]) -> str:
+    """Decode the last STDERR_TAIL_BYTES of captured subprocess output."""
+    if not data:
+        return ""
+    return data[-STDERR_TAIL_BYTES:].decode(errors="replace")
+
+# Free disk space changes slowly relative to request cadence, so statvfs
+# results are reused for a short time instead of hitting the FS every call.
+DISK_FREE_CACHE_TTL_SECONDS = 2.0
+_disk_free_cache: Dict[str, Tuple[float, int]] = {}
+_disk_free_lock = threading.Lock()
+
+
+def _disk_free(path_str: str) -> int:
+    """Return free bytes on the filesystem containing `path_str` (TTL-cached)."""
+    now = time.monotonic()
+    with _disk_free_lock:
+        cached = _disk_free_cache.get(path_str)
+        if cached is not None and now - cached[0] < DISK_FREE_CACHE_TTL_SECONDS:
+            return cached[1]
+    free = shutil.disk_usage(path_str).free
+    with _disk_free_lock:
+        _disk_free_cache[path_str] = (now, free)
+    return free
+
+
+async def _drain_stream_tail(stream: asyncio.StreamReader, tail: deque) -> None:
+    """Consume a subprocess stream, keeping only its last lines in `tail`.
+
+    Demucs draws its progress bar with carriage returns, so both CR and LF
+    are treated as line breaks. Memory stays bounded by `tail.maxlen`.
+    """
+    pending = ""
+    while True:
+        chunk = await stream.read(64 * 1024)
+        if not chunk:
+            break
+        lines = (pending + chunk.decode(errors="replace")).replace("\r", "\n").split("\n")
+        pending = lines.pop()
+        tail.extend(line + "\n" for line in lines if line)
+        if len(pending) > 64 * 1024:
+            tail.append(pending)
+            pending = ""
+    if pending:
+        tail.append(pending)
+
+
+def _kernel_copy_loop(copy_chunk, size: int) -> bool:
+    """Call `copy_chunk(offset, count)` until `size` bytes are copied."""
+    offset = 0
+    while offset < size:
+        copied = copy_chunk(offset, size - offset)
+        if not copied:
+            return False
+        offset += copied
+    return True
+
+
+def _fast_copy(src: Path, dst: Path) -> bool:
+    """
+    Copy `src` to `dst` without routing bytes through Python buffers
+
+    Tries, in order: a hardlink, `os.copy_file_range` (Linux >= 4.5) and
+    `os.sendfile`. Returns False when none of them applies so the caller can
+    fall back to a userspace chunked copy.
+    """
+    try:
+        os.link(src, dst)
+        return True
+    except OSError:
+        pass
+
+    copy_file_range = getattr(os, "copy_file_range", None)
+    sendfile = getattr(os, "sendfile", None)
+    if copy_file_range is None and sendfile is None:
+        return False
+
+    size = src.stat().st_size
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        strategies = []
+        if copy_file_range is not None:
+            strategies.append(lambda offset, count: copy_file_range(in_fd, out_fd, count, offset, offset))
+        if sendfile is not None:
+            strategies.append(lambda offset, count: sendfile(out_fd, in_fd, offset, count))
+        for copy_chunk in strategies:
+            try:
+                if _kernel_copy_loop(copy_chunk, size):
+                    return True
+            except OSError:
+                pass
+            # Discard any partial output before trying the next mechanism
+            fdst.truncate(0)
+            os.lseek(out_fd, 0, os.SEEK_SET)
+    dst.unlink(missing_ok=True)
+    return False
+
 
 class SecurityError(Exception):
     """Raised when security validation fails"""
@@ -30,7 +159,37 @@ class StemSeparationService:
     
     def __init__(self):
         self.output_dir = settings.OUTPUT_DIR
-        self.temp_dir = settings.TEMP_DIR
+
+        # Whitelists are fixed for the lifetime of the shared service, so build
+        # them once: hashed lookups for models/formats and a single C-level
+        # str.startswith(tuple) for the allowed path prefixes.
+        self._supported_models = list(settings.supported_demucs_models_list)
+        self._supported_models_set = frozenset(self._supported_models)
+        self._supported_formats_set = frozenset(settings.SUPPORTED_STEM_FORMATS)
+        self._allowed_path_prefixes = self._build_allowed_path_prefixes()
+
+    def _select_temp_dir(self, required_bytes: Optional[int]) -> Path:
+        """
+        Use the tmpfs temp dir when enabled and this job fits in it, else TEMP_DIR
+
+        Args:
+            required_bytes: Estimated Demucs output size (None if unknown)
+        """
+        if not settings.STEM_TEMP_USE_TMPFS:
+            return settings.TEMP_DIR
+
+        tmpfs_dir = settings.STEM_TEMP_TMPFS_DIR
+        needed = max(required_bytes or 0, settings.STEM_TEMP_TMPFS_MIN_FREE_MB * 1024 * 1024)
+        try:
+            if not os.access(tmpfs_dir.parent, os.W_OK):
+                return settings.TEMP_DIR
+            if _disk_free(str(tmpfs_dir.parent)) < needed:
+                return settings.TEMP_DIR
+            tmpfs_dir.mkdir(parents=True, exist_ok=True)
+            return tmpfs_dir
+        except OSError as e:
+            logger.warning(f"tmpfs temp dir unavailable, using TEMP_DIR: {type(e).__name__}")
+            return settings.TEMP_DIR
     
     def _validate_model_name(self, model: str) -> str:
         """
@@ -52,14 +211,51 @@ class StemSeparationService:
         cleaned_model = ''.join(c for c in model if c.isalnum() or c in '-_.')
         
         # Validate against whitelist
-        supported_models = settings.supported_demucs_models_list
-        if cleaned_model not in supported_models:
-            logger.error(f"Security validation failed: Invalid model '{cleaned_model}'. Supported models: {supported_models}")
-            raise SecurityError(f"Invalid model '{cleaned_model}'. Supported models: {supported_models}")
+        if cleaned_model not in self._supported_models_set:
+            logger.error(f"Security validation failed: Invalid model '{cleaned_model}'. Supported models: {self._supported_models}")
+            raise SecurityError(f"Invalid model '{cleaned_model}'. Supported models: {self._supported_models}")
         
         logger.debug(f"Model validation passed: {cleaned_model}")
         return cleaned_model
     
+    def _validate_device(self, device: str) -> Optional[str]:
+        """
+        Validate the configured Demucs device
+
+        Args:
+            device: Device name from settings (empty for auto-detection)
+
+        Returns:
+            Validated device name, or None to let Demucs pick
+
+        Raises:
+            SecurityError: If device name is invalid
+        """
+        if not device:
+            return None
+        cleaned_device = device.strip().lower()
+        if not DEMUCS_DEVICE_PATTERN.match(cleaned_device):
+            raise SecurityError(f"Invalid Demucs device '{cleaned_device}'")
+        return cleaned_device
+
+    def _build_allowed_path_prefixes(self) -> Tuple[str, ...]:
+        """Build the allowed directory prefixes (temporary directories and uploads)"""
+        prefixes = (
+            '/tmp/',
+            '/var/folders/',  # macOS temp directories
+            '/private/var/folders/',  # macOS temp directories (resolved)
+            '/private/tmp/',  # macOS temp directories (resolved)
+            str(Path.cwd()),  # Current working directory
+            tempfile.gettempdir(),  # System temp directory
+            str(settings.BASE_DIR.resolve()),
+            str(settings.TEMP_DIR.resolve()),
+            str(settings.OUTPUT_DIR.resolve()),
+            str(settings.UPLOAD_DIR.resolve()),
+        )
+        if settings.STEM_TEMP_USE_TMPFS:
+            prefixes += (str(settings.STEM_TEMP_TMPFS_DIR.resolve()),)
+        return prefixes
+
     def _validate_file_path(self, file_path: str, must_exist: bool = True) -> Path:
         """
         Validate and sanitize file paths to prevent path traversal
@@ -84,27 +280,8 @@ class StemSeparationService:
             # Ensure path doesn't contain dangerous sequences
             path_str = str(path)
             
-            # Define allowed directories (temporary directories and uploads)
-            base_dir = str(settings.BASE_DIR.resolve())
-            temp_dir = str(settings.TEMP_DIR.resolve())
-            output_dir = str(settings.OUTPUT_DIR.resolve())
-            upload_dir = str(settings.UPLOAD_DIR.resolve())
-            allowed_prefixes = [
-                '/tmp/',
-                '/var/folders/',  # macOS temp directories
-                '/private/var/folders/',  # macOS temp directories (resolved)
-                '/private/tmp/',  # macOS temp directories (resolved)
-                str(Path.cwd()),  # Current working directory
-                tempfile.gettempdir(),  # System temp directory
-                base_dir,
-                temp_dir,
-                output_dir,
-                upload_dir,
-            ]
-            
             # Check if path is in allowed directories
-            path_allowed = any(path_str.startswith(prefix) for prefix in allowed_prefixes)
-            if not path_allowed:
+            if not path_str.startswith(self._allowed_path_prefixes):
                 raise SecurityError(f"File path not in allowed directories: {path_str}")
             
             # Additional security checks
@@ -144,35 +321,44 @@ class StemSeparationService:
         
         # Clean and validate format
         cleaned_format = format_name.lower().strip()
-        if cleaned_format not in settings.SUPPORTED_STEM_FORMATS:
+        if cleaned_format not in self._supported_formats_set:
             raise SecurityError(f"Invalid format '{cleaned_format}'. Supported: {settings.SUPPORTED_STEM_FORMATS}")
         
         return cleaned_format
 
-    def _ensure_disk_space(self, path: Path, required_bytes: int, label: str) -> None:
-        """Ensure filesystem containing `path` has `required_bytes` free."""
+    def _free_bytes(self, path: Path, label: str) -> Optional[int]:
+        """Free bytes on the filesystem containing `path`, or None if unknown."""
         try:
-            usage = shutil.disk_usage(str(path))
-            if usage.free < required_bytes:
-                free_mb = usage.free / (1024 * 1024)
-                req_mb = required_bytes / (1024 * 1024)
-                raise SecurityError(
-                    f"Insufficient disk space in {label} ({path}). "
-                    f"Free: {free_mb:.0f}MB, required (estimate): {req_mb:.0f}MB. "
-                    f"Clean up /var/www/apitools/temp and /var/www/apitools/outputs or move TEMP_DIR/OUTPUT_DIR to a larger disk."
-                )
+            return _disk_free(str(path))
         except FileNotFoundError:
             # If the directory doesn't exist yet, let upstream create it.
-            return
-        except SecurityError:
-            raise
+            return None
         except Exception as e:
             logger.warning(f"Disk space check failed for {label} at {path}: {type(e).__name__}")
+            return None
+
+    def _require_free_space(self, path: Path, free: Optional[int], required_bytes: int, label: str) -> None:
+        """Raise if a measured `free` byte count is below `required_bytes`."""
+        if free is not None and free < required_bytes:
+            free_mb = free / (1024 * 1024)
+            req_mb = required_bytes / (1024 * 1024)
+            raise SecurityError(
+                f"Insufficient disk space in {label} ({path}). "
+                f"Free: {free_mb:.0f}MB, required (estimate): {req_mb:.0f}MB. "
+                f"Clean up /var/www/apitools/temp and /var/www/apitools/outputs or move TEMP_DIR/OUTPUT_DIR to a larger disk."
+            )
+
+    def _ensure_disk_space(self, path: Path, required_bytes: int, label: str) -> None:
+        """Ensure filesystem containing `path` has `required_bytes` free."""
+        self._require_free_space(path, self._free_bytes(path, label), required_bytes, label)
 
-    def _estimate_required_temp_bytes(self, audio_path: Path, stem_count: int) -> Optional[int]:
-        """Estimate temp bytes needed for Demucs WAV stems.
+    def _estimate_required_temp_bytes(
+        self, audio_path: Path, stem_count: int, stem_format: str = "wav"
+    ) -> Optional[int]:
+        """Estimate temp bytes needed for the stems Demucs writes.
 
         Uses ffprobe to get duration quickly without decoding full audio.
+        `stem_format` is the format Demucs writes (WAV unless it encodes natively).
         Returns None if duration can't be determined.
         """
         try:
@@ -189,20 +375,17 @@ class StemSeparationService:
                     str(audio_path),
                 ],
                 capture_output=True,
-                text=True,
                 timeout=10,
             )
             if probe.returncode != 0:
                 return None
-            duration_s = float((probe.stdout or "").strip())
+            duration_s = float((probe.stdout or b"").decode(errors="replace").strip())
             if duration_s <= 0:
                 return None
 
-            # Conservative estimate: float32 WAV, stereo, 44.1kHz
-            sample_rate = 44100
-            channels = 2
-            bytes_per_sample = 4
-            bytes_per_second_per_stem = sample_rate * channels * bytes_per_sample
+            bytes_per_second_per_stem = STEM_BYTES_PER_SECOND.get(
+                stem_format, STEM_BYTES_PER_SECOND["wav"]
+            )
 
             # Add headroom: demucs writes multiple files and there is container overhead.
             safety_factor = 2.0
@@ -237,7 +420,7 @@ class StemSeparationService:
         Returns:
             Dictionary with separation results
         """
-        job_id = str(uuid.uuid4())
+        job_id = generate_id()
         start_time = time.time()
         
         try:
@@ -245,48 +428,79 @@ class StemSeparationService:
             validated_model = self._validate_model_name(model)
             validated_audio_path = self._validate_file_path(audio_file_path, must_exist=True)
             validated_format = self._validate_output_format(output_format)
+            validated_device = self._validate_device(settings.DEMUCS_DEVICE)
             
             # Validate stems if provided
             validated_stems = None
             if stems:
-                valid_stem_names = ['vocals', 'drums', 'bass', 'other']
                 validated_stems = []
                 for stem in stems:
-                    if not isinstance(stem, str) or stem not in valid_stem_names:
-                        raise SecurityError(f"Invalid stem name '{stem}'. Valid: {valid_stem_names}")
+                    if not isinstance(stem, str) or stem not in VALID_STEMS_SET:
+                        raise SecurityError(f"Invalid stem name '{stem}'. Valid: {VALID_STEMS_TEXT}")
                     validated_stems.append(stem)
             
+            # Let Demucs encode mp3/flac itself; other formats go through WAV + ffmpeg.
+            native_format_args = DEMUCS_NATIVE_FORMAT_ARGS.get(validated_format)
+            demucs_format = validated_format if native_format_args else "wav"
+
+            # The input stat, ffprobe duration probe and disk checks touch independent
+            # resources, so run them concurrently off the event loop.
+            # Demucs writes stems into TEMP_DIR before we convert/move them;
+            # its free space is read while ffprobe estimates how much is needed.
+            loop = asyncio.get_event_loop()
+            input_stat, required_temp_bytes, temp_free, _ = await asyncio.gather(
+                loop.run_in_executor(None, validated_audio_path.stat),
+                loop.run_in_executor(
+                    None,
+                    self._estimate_required_temp_bytes,
+                    validated_audio_path,
+                    len(validated_stems) if validated_stems else 4,
+                    demucs_format,
+                ),
+                loop.run_in_executor(None, self._free_bytes, settings.TEMP_DIR, "TEMP_DIR"),
+                # Also ensure some space in OUTPUT_DIR for final converted stems.
+                loop.run_in_executor(
+                    None, self._ensure_disk_space, Path(self.output_dir), 256 * 1024 * 1024, "OUTPUT_DIR"
+                ),
+            )
+
+            # tmpfs only takes jobs that fit; fail fast if TEMP_DIR can't hold the rest.
+            temp_dir = self._select_temp_dir(required_temp_bytes)
+            if required_temp_bytes is not None and temp_dir == settings.TEMP_DIR:
+                self._require_free_space(temp_dir, temp_free, required_temp_bytes, label="TEMP_DIR")
+
             # Memory management: estimate required memory and check availability
-            file_size = validated_audio_path.stat().st_size
+            file_size = input_stat.st_size
             estimated_memory = efficient_processor.estimate_processing_memory(file_size, 'stem_separation')
             
             logger.info(f"Starting stem separation: model={validated_model}, format={validated_format}, stems={validated_stems}")
             logger.info(f"File size: {file_size / 1024 / 1024:.1f}MB, estimated memory: {estimated_memory}MB")
-
-            # Fail fast if we don't have enough disk space for Demucs WAV outputs.
-            # Demucs writes WAV stems into TEMP_DIR before we convert/move them.
-            required_temp_bytes = self._estimate_required_temp_bytes(validated_audio_path, stem_count=len(validated_stems) if validated_stems else 4)
-            if required_temp_bytes is not None:
-                self._ensure_disk_space(Path(self.temp_dir), required_temp_bytes, label="TEMP_DIR")
-            # Also ensure some space in OUTPUT_DIR for final converted stems.
-            self._ensure_disk_space(Path(self.output_dir), 256 * 1024 * 1024, label="OUTPUT_DIR")
             
             # Acquire operation slot with memory check
             async with operation_limiter.acquire_operation_slot(f"stem_separation_{job_id}", estimated_memory):
             
                 # Create temporary directory for processing
-                with tempfile.TemporaryDirectory(dir=self.temp_dir) as temp_process_dir:
+                with tempfile.TemporaryDirectory(dir=temp_dir) as temp_process_dir:
                     
                     # Run Demucs separation with validated inputs
                     demucs_output_dir = os.path.join(temp_process_dir, "demucs_output")
                     
                     # Build command with validated parameters - NO USER INPUT DIRECTLY PASSED
+                    # FP16 runs through our wrapper, which calls demucs.separate under autocast;
+                    # only then does Demucs need to start in BASE_DIR to import it
+                    demucs_module = (
+                        "app.services.demucs_runner" if settings.DEMUCS_HALF_PRECISION else "demucs.separate"
+                    )
+                    demucs_cwd = str(settings.BASE_DIR) if settings.DEMUCS_HALF_PRECISION else None
                     cmd = [
-                        "python", "-m", "demucs.separate",
+                        "python", "-m", demucs_module,
                         "-n", validated_model,  # Validated against whitelist
                         "-o", demucs_output_dir,  # Our controlled directory
-                        str(validated_audio_path)  # Validated file path
+                        *(native_format_args or []),  # Fixed flags from whitelist
                     ]
+                    if validated_device:
+                        cmd.extend(["-d", validated_device])  # Validated against pattern
+                    cmd.append(str(validated_audio_path))  # Validated file path
                     
                     logger.info(f"Running Demucs with validated command: {' '.join(cmd[:6])}... (path hidden for security)")
                     
@@ -297,26 +511,48 @@ class StemSeparationService:
                             'error': f"Insufficient memory for processing. Required: {estimated_memory}MB"
                         }
                     
-                    # Run Demucs with process monitoring
-                    process = subprocess.Popen(
-                        cmd,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        text=True
+                    # Run Demucs with process monitoring. stdout is discarded and
+                    # only the tail of stderr is kept, so memory stays bounded
+                    # no matter how long the job runs.
+                    process = await asyncio.create_subprocess_exec(
+                        *cmd,
+                        stdout=asyncio.subprocess.DEVNULL,
+                        stderr=asyncio.subprocess.PIPE,
+                        cwd=demucs_cwd
                     )
+                    stderr_tail: deque = deque(maxlen=STDERR_TAIL_LINES)
+                    drain_task = asyncio.create_task(_drain_stream_tail(process.stderr, stderr_tail))
                     
                     # Monitor process memory usage
                     process_manager.monitor_process(process, f"demucs_{job_id}")
                     
-                    # Wait for completion with configurable timeout
+                    # Wait for completion with configurable timeout, ending in time
+                    # to terminate Demucs cleanly before the request's deadline
                     timeout_seconds = settings.STEM_SEPARATION_TIMEOUT
+                    remaining = time_remaining()
+                    if remaining is not None:
+                        timeout_seconds = max(1, min(timeout_seconds, remaining - 5))
                     try:
-                        stdout, stderr = process.communicate(timeout=timeout_seconds)
-                        result_returncode = process.returncode
-                    except subprocess.TimeoutExpired:
+                        result_returncode = await asyncio.wait_for(process.wait(), timeout=timeout_seconds)
+                    except asyncio.TimeoutError:
                         process.terminate()
-                        process.wait()
+                        try:
+                            await asyncio.wait_for(process.wait(), timeout=5)
+                        except asyncio.TimeoutError:
+                            process.kill()
+                            await process.wait()
                         raise subprocess.TimeoutExpired(cmd, timeout_seconds)
+                    except asyncio.CancelledError:
+                        # Demucs may have exited between the wait and the cancel
+                        if process.returncode is None:
+                            try:
+                                process.kill()
+                            except ProcessLookupError:
+                                pass
+                        raise
+                    finally:
+                        await drain_task
+                    stderr = "".join(stderr_tail)
                 
                     if result_returncode != 0:
                         logger.error(f"Demucs failed: {stderr}")
@@ -330,7 +566,7 @@ class StemSeparationService:
                         logger.warning("Memory usage high after Demucs processing")
                     
                     # Find the separated stems
-                    stems_dir = self._find_stems_directory(demucs_output_dir)
+                    stems_dir = self._find_stems_directory(demucs_output_dir, demucs_format)
                     if not stems_dir:
                         return {
                             'success': False,
@@ -339,7 +575,8 @@ class StemSeparationService:
                     
                     # Convert and move stems to final location with validated parameters
                     stem_files = await self._process_stems(
-                        stems_dir, job_id, validated_format, validated_stems, original_filename
+                        stems_dir, job_id, validated_format, validated_stems, original_filename,
+                        source_format=demucs_format
                     )
                 
                 if not stem_files:
@@ -373,15 +610,16 @@ class StemSeparationService:
                 'error': f"Unexpected error: {str(e)}"
             }
     
-    def _find_stems_directory(self, demucs_output_dir: str) -> Optional[str]:
+    def _find_stems_directory(self, demucs_output_dir: str, stem_format: str = "wav") -> Optional[str]:
         """Find the directory containing separated stems"""
+        suffix = f".{stem_format}"
         try:
             # Demucs creates a nested directory structure
             # Look for the actual stems directory
             for root, dirs, files in os.walk(demucs_output_dir):
-                # Look for directories containing .wav files
-                wav_files = [f for f in files if f.endswith('.wav')]
-                if len(wav_files) >= 2:  # Should have at least 2 stems
+                # Look for directories containing stem files
+                stem_files = [f for f in files if f.endswith(suffix)]
+                if len(stem_files) >= 2:  # Should have at least 2 stems
                     return root
             return None
         except Exception as e:
@@ -394,7 +632,8 @@ class StemSeparationService:
         job_id: str,
         output_format: str,
         requested_stems: Optional[List[str]] = None,
-        original_filename: Optional[str] = None
+        original_filename: Optional[str] = None,
+        source_format: str = "wav"
     ) -> Dict[str, str]:
         """
         Process and convert stems to the requested format
@@ -405,6 +644,7 @@ class StemSeparationService:
             output_format: Target output format
             requested_stems: Specific stems to process (None for all)
             original_filename: Original filename to use for naming stems (without extension)
+            source_format: Format Demucs wrote the stems in
 
         Returns:
             Dictionary mapping stem names to file paths
@@ -416,52 +656,85 @@ class StemSeparationService:
         job_output_dir.mkdir(parents=True, exist_ok=True)
         
         try:
-            # Find all stem files
-            available_stems = {}
-            for filename in os.listdir(stems_dir):
-                if filename.endswith('.wav'):
-                    stem_name = filename.replace('.wav', '')
-                    available_stems[stem_name] = os.path.join(stems_dir, filename)
-            
-            # Process requested stems (or all if none specified)
-            stems_to_process = requested_stems if requested_stems else list(available_stems.keys())
-            
-            for stem_name in stems_to_process:
-                if stem_name in available_stems:
-                    input_file = available_stems[stem_name]
+            # Output names share the original filename minus its extension
+            base_name = None
+            if original_filename:
+                base_name = original_filename
+                if '.' in base_name:
+                    base_name = '.'.join(base_name.split('.')[:-1])
+
+            # Single directory pass: pick requested stems (or all if none specified)
+            source_suffix = f".{source_format}"
+            requested_set = set(requested_stems) if requested_stems else None
+            stem_names = []
+            exports = []
+            with os.scandir(stems_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(source_suffix):
+                        continue
+                    stem_name = entry.name[:-len(source_suffix)]
+                    if requested_set is not None and stem_name not in requested_set:
+                        continue
 
                     # Generate output filename based on original filename or fallback to stem name
-                    if original_filename:
-                        # Remove extension from original filename if present
-                        base_name = original_filename
-                        if '.' in base_name:
-                            base_name = '.'.join(base_name.split('.')[:-1])
+                    if base_name is not None:
                         output_filename = f"{base_name} - {stem_name}.{output_format}"
                     else:
                         output_filename = f"{stem_name}.{output_format}"
 
-                    output_file = job_output_dir / output_filename
-                    
-                    if output_format == "wav":
-                        # Use memory-efficient copying for WAV files
-                        await efficient_processor.copy_file_chunked(
-                            Path(input_file), output_file
-                        )
-                    else:
-                        # Convert using ffmpeg
-                        success = await self._convert_audio_format_async(input_file, str(output_file), output_format)
-                        if not success:
-                            logger.warning(f"Failed to convert {stem_name} to {output_format}")
-                            continue
-                    
-                    stem_files[stem_name] = str(output_file)
-                    logger.info(f"Processed stem: {stem_name} -> {output_filename}")
+                    stem_names.append(stem_name)
+                    exports.append(self._export_stem(
+                        entry.path, stem_name, job_output_dir / output_filename,
+                        source_format, output_format
+                    ))
+
+            results = await asyncio.gather(*exports)
+            for stem_name, output_file in zip(stem_names, results):
+                if output_file is not None:
+                    stem_files[stem_name] = output_file
             
             return stem_files
             
         except Exception as e:
             logger.error(f"Error processing stems: {e}")
             return {}
+
+    async def _export_stem(
+        self,
+        input_file: str,
+        stem_name: str,
+        output_file: Path,
+        source_format: str,
+        output_format: str
+    ) -> Optional[str]:
+        """
+        Move, copy or convert a single stem into its final location
+
+        Returns:
+            Output file path, or None if conversion failed
+        """
+        if source_format == output_format and output_format != "wav":
+            # Demucs already encoded the stem; just move it into place
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, shutil.move, input_file, str(output_file))
+        elif output_format == "wav":
+            # Kernel-side copy (link/copy_file_range/sendfile), falling
+            # back to memory-efficient chunked copying
+            loop = asyncio.get_event_loop()
+            copied = await loop.run_in_executor(None, _fast_copy, Path(input_file), output_file)
+            if not copied:
+                await efficient_processor.copy_file_chunked(
+                    Path(input_file), output_file
+                )
+        else:
+            # Convert using ffmpeg
+            success = await self._convert_audio_format_async(input_file, str(output_file), output_format)
+            if not success:
+                logger.warning(f"Failed to convert {stem_name} to {output_format}")
+                return None
+
+        logger.info(f"Processed stem: {stem_name} -> {output_file.name}")
+        return str(output_file)
     
     async def _convert_audio_format_async(self, input_file: str, output_file: str, format: str) -> bool:
         """
@@ -516,19 +789,19 @@ class StemSeparationService:
             from concurrent.futures import ThreadPoolExecutor
             
             def _run_ffmpeg():
+                # Bytes I/O, and no preexec_fn so CPython can use its vfork/posix_spawn fast path
                 process = subprocess.Popen(
                     cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE
                 )
                 
                 # Monitor process memory
                 process_manager.monitor_process(process, f"ffmpeg_conversion")
                 
                 try:
-                    stdout, stderr = process.communicate(timeout=300)  # 5 minute timeout
-                    return process.returncode, stderr
+                    _, stderr = process.communicate(timeout=300)  # 5 minute timeout
+                    return process.returncode, _decode_tail(stderr)
                 except subprocess.TimeoutExpired:
                     process.terminate()
                     process.wait()
@@ -594,13 +867,13 @@ class StemSeparationService:
             
             result = subprocess.run(
                 cmd,
-                capture_output=True,
-                text=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 timeout=300  # 5 minute timeout for conversion
             )
             
             if result.returncode != 0:
-                logger.error(f"FFmpeg conversion failed for {validated_format}: {result.stderr}")
+                logger.error(f"FFmpeg conversion failed for {validated_format}: {_decode_tail(result.stderr)}")
                 return False
             
             return True
@@ -622,3 +895,7 @@ class StemSeparationService:
     def get_supported_formats(self) -> List[str]:
         """Get list of supported output formats"""
         return settings.SUPPORTED_STEM_FORMATS
+
+
+# Global service instance
+stem_service = StemSeparationService()
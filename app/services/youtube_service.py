@@ -3,30 +3,292 @@ YouTube download service using yt-dlp
 """
 
 import os
-import uuid
+import sys
+import time
+import errno
+import asyncio
 import logging
 import tempfile
 import shutil
+import functools
+import threading
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
 import yt_dlp
-from yt_dlp.utils import DownloadError
+import yt_dlp.cookies
+from yt_dlp.postprocessor import FFmpegExtractAudioPP
+from yt_dlp.utils import DownloadCancelled, DownloadError
 
 from app.core.config import settings
+from app.core.deadline import request_deadline, time_remaining
+from app.core.filenames import sanitize_title
+from app.core.identifiers import generate_id
+from app.core.memory_management import schedule_memory_release
 from app.models.responses import VideoMetadata
+from app.services.metadata_cache import metadata_cache, extract_video_id
 
 logger = logging.getLogger(__name__)
 
 
+def _move_file(src: str, dst: Path) -> None:
+    """Atomically rename `src` to `dst`, copying only across filesystems"""
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Different devices: copyfile uses sendfile on Linux
+        shutil.copyfile(src, dst)
+        os.unlink(src)
+
+
+# Idle partial-download dirs by root, reused instead of mkdtemp + rmtree per download
+_partial_dir_pool: Dict[str, List[str]] = {}
+_partial_dir_pool_lock = threading.Lock()
+
+
+def _acquire_partial_dir(root: Path) -> str:
+    """Take an empty partial-download dir under `root`, creating one if none is idle"""
+    with _partial_dir_pool_lock:
+        idle = _partial_dir_pool.get(str(root))
+        path = idle.pop() if idle else None
+    if path is None:
+        root.mkdir(parents=True, exist_ok=True)
+        return tempfile.mkdtemp(dir=root)
+    # Periodic cleanup prunes empty directories, so an idle dir may be gone
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _release_partial_dir(root: Path, path: str) -> None:
+    """Empty a partial-download dir and return it to the pool, or remove it if the pool is full"""
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+    except OSError:
+        shutil.rmtree(path, ignore_errors=True)
+        return
+    with _partial_dir_pool_lock:
+        idle = _partial_dir_pool.setdefault(str(root), [])
+        if len(idle) < settings.YOUTUBE_PARTIAL_DIR_POOL_SIZE:
+            idle.append(path)
+            return
+    shutil.rmtree(path, ignore_errors=True)
+
+
+# Faster AAC encoders to prefer over ffmpeg's native `aac`, best first:
+# AudioToolbox (macOS hardware) and Fraunhofer FDK (where ffmpeg is built with it).
+PREFERRED_AUDIO_ENCODERS = {
+    "aac": ("aac_at", "libfdk_aac"),
+    "m4a": ("aac_at", "libfdk_aac"),
+}
+
+
+# Source formats to select so FFmpegExtractAudio can stream-copy instead of re-encoding
+COPY_FRIENDLY_FORMATS = {
+    "m4a": "bestaudio[acodec^=mp4a]/bestaudio/best",
+    "aac": "bestaudio[acodec^=mp4a]/bestaudio/best",
+    "opus": "bestaudio[acodec=opus]/bestaudio/best",
+}
+
+# audio_format value that keeps the source codec and never re-encodes
+COPY_AUDIO_FORMAT = "copy"
+
+
+class FastExtractAudioPP(FFmpegExtractAudioPP):
+    """
+    FFmpegExtractAudio that can swap ffmpeg's native AAC encoder for a faster one
+
+    The swap happens only when yt-dlp actually re-encodes to AAC, so
+    stream copies of AAC sources stay copies.
+    """
+
+    def __init__(self, downloader=None, aac_encoder: Optional[str] = None, **kwargs):
+        super().__init__(downloader, **kwargs)
+        self._aac_encoder = aac_encoder
+
+    def run_ffmpeg(self, path, out_path, codec, more_opts):
+        if codec == 'aac' and self._aac_encoder:
+            codec = self._aac_encoder
+        return super().run_ffmpeg(path, out_path, codec, more_opts)
+
+
+@functools.lru_cache(maxsize=1)
+def _available_ffmpeg_encoders() -> frozenset:
+    """Names of the encoders the local ffmpeg supports (probed once)"""
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=10,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return frozenset()
+    encoders = set()
+    for line in result.stdout.decode(errors="replace").splitlines():
+        # Lines look like " A....D aac_at   aac (AudioToolbox) (codec aac)"
+        parts = line.split()
+        if len(parts) >= 2 and len(parts[0]) == 6 and parts[0][0] == "A":
+            encoders.add(parts[1])
+    return frozenset(encoders)
+
+
+def _pick_audio_encoder(audio_format: str) -> Optional[str]:
+    """Return a preferred available encoder for `audio_format`, or None for ffmpeg's default"""
+    candidates = PREFERRED_AUDIO_ENCODERS.get(audio_format)
+    if not candidates:
+        return None
+    available = _available_ffmpeg_encoders()
+    return next((encoder for encoder in candidates if encoder in available), None)
+
+
+_download_semaphore: Optional[asyncio.Semaphore] = None
+
+# Cookie jar resolved once at startup (see `load_shared_cookiejar`)
+_shared_cookiejar = None
+
+
+def load_shared_cookiejar():
+    """
+    Load YouTube cookies once and share them across downloads
+
+    Reads the configured cookies file, or falls back to Firefox's cookie
+    store, so each download doesn't re-read the file or re-scan and decrypt
+    the browser profile.
+
+    Returns:
+        The loaded cookie jar, or None if cookies could not be loaded
+    """
+    global _shared_cookiejar
+    cookie_file = None
+    browser_specification = None
+    if settings.YOUTUBE_COOKIES_FILE and Path(settings.YOUTUBE_COOKIES_FILE).exists():
+        cookie_file = str(Path(settings.YOUTUBE_COOKIES_FILE))
+    else:
+        if settings.YOUTUBE_COOKIES_FILE:
+            logger.warning("Configured cookies file not found: %s", settings.YOUTUBE_COOKIES_FILE)
+        browser_specification = ('firefox', None, None, None)
+    
+    try:
+        _shared_cookiejar = yt_dlp.cookies.load_cookies(cookie_file, browser_specification, None)
+        logger.info("Loaded YouTube cookies (%d cookies)", len(_shared_cookiejar))
+    except Exception as e:
+        logger.warning("Failed to load YouTube cookies: %s. Downloads will load cookies per request.", type(e).__name__)
+        _shared_cookiejar = None
+    return _shared_cookiejar
+
+
+def _get_download_semaphore() -> asyncio.Semaphore:
+    """Semaphore capping concurrent yt-dlp downloads (created on the running loop)"""
+    global _download_semaphore
+    if _download_semaphore is None:
+        _download_semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_DOWNLOADS)
+    return _download_semaphore
+
+
+# Long-lived process pool for batch downloads (see `start_download_pool`)
+_download_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _worker_warmup() -> None:
+    """Process pool initializer: import yt-dlp's extractors and load cookies once per worker"""
+    yt_dlp.YoutubeDL({'quiet': True})
+    load_shared_cookiejar()
+
+
+def start_download_pool() -> ProcessPoolExecutor:
+    """
+    Create the shared batch download pool
+
+    Workers are started with forkserver (spawn where unavailable) rather
+    than fork, which is unsafe from a multithreaded asyncio process. The
+    fork server preloads only this module (yt-dlp and settings), not
+    `__main__`, so workers never build the FastAPI app. Each API worker
+    process has its own pool of MAX_PARALLEL_DOWNLOADS processes.
+
+    Returns:
+        The pool; also kept as the module-level `_download_pool`
+    """
+    global _download_pool
+    if _download_pool is None:
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload([__name__])
+        else:
+            context = multiprocessing.get_context("spawn")
+        _download_pool = ProcessPoolExecutor(
+            max_workers=settings.MAX_PARALLEL_DOWNLOADS,
+            mp_context=context,
+            initializer=_worker_warmup
+        )
+    return _download_pool
+
+
+def shutdown_download_pool() -> None:
+    """Stop the batch download pool without waiting for running downloads"""
+    global _download_pool
+    pool, _download_pool = _download_pool, None
+    if pool is None:
+        return
+    if sys.version_info >= (3, 9):
+        pool.shutdown(wait=False, cancel_futures=True)
+    else:
+        pool.shutdown(wait=False)
+
+
+def _download_in_worker(
+    url: str,
+    audio_quality: int,
+    audio_format: str,
+    extract_metadata: bool,
+    wall_deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Process pool entry point for a single batch download
+
+    The deadline crosses the process boundary as a time.time() value and is
+    converted back to this process's monotonic clock.
+    """
+    deadline = None
+    if wall_deadline is not None:
+        deadline = time.monotonic() + (wall_deadline - time.time())
+    return YouTubeService()._download_audio_sync(
+        url, audio_quality, audio_format, extract_metadata, deadline
+    )
+
+
+async def _run_holding_slot(future: asyncio.Future) -> Any:
+    """
+    Await an executor future, holding the caller's download slot until it really ends
+
+    Threads and worker processes can't be cancelled; on cancellation wait
+    for the deadline hooks to stop the download before giving the slot back.
+    """
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait({future})
+        raise
+
+
 class YouTubeService:
     """Service for downloading YouTube videos and extracting audio"""
     
     def __init__(self):
         self.output_dir = settings.OUTPUT_DIR
         self.temp_dir = settings.TEMP_DIR
+        self._cookiejar = _shared_cookiejar
     
-    def download_audio(
+    async def download_audio(
         self,
         url: str,
         audio_quality: int = 0,
@@ -34,7 +296,10 @@ class YouTubeService:
         extract_metadata: bool = True
     ) -> Dict[str, Any]:
         """
-        Download audio from YouTube URL
+        Download audio from YouTube URL without blocking the event loop
+        
+        yt-dlp, the file move and the stat run in the default executor. At most
+        MAX_CONCURRENT_DOWNLOADS downloads run at once; others wait their turn.
         
         Args:
             url: YouTube video URL
@@ -45,102 +310,206 @@ class YouTubeService:
         Returns:
             Dictionary with download results
         """
-        file_id = str(uuid.uuid4())
+        async with _get_download_semaphore():
+            loop = asyncio.get_event_loop()
+            future = loop.run_in_executor(
+                None,
+                self._download_audio_sync,
+                url,
+                audio_quality,
+                audio_format,
+                extract_metadata,
+                request_deadline.get()
+            )
+            try:
+                return await _run_holding_slot(future)
+            finally:
+                # yt-dlp's info dicts leave the heap at its peak size
+                schedule_memory_release()
+    
+    async def download_audio_batch(
+        self,
+        urls: List[str],
+        audio_quality: int = 0,
+        audio_format: str = "mp3",
+        extract_metadata: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Download audio for several YouTube URLs in parallel
+        
+        Each URL is downloaded in a worker of the shared process pool (yt-dlp
+        keeps module-level state and extraction is network-bound per
+        connection). Every URL takes a MAX_CONCURRENT_DOWNLOADS slot, like a
+        single download, and stops at the request deadline.
+        
+        Args:
+            urls: YouTube video URLs
+            audio_quality: Audio quality (0=best, 10=worst)
+            audio_format: Output audio format
+            extract_metadata: Whether to extract video metadata
+            
+        Returns:
+            List of download results, in the same order as `urls`
+        """
+        if not urls:
+            return []
+        
+        loop = asyncio.get_event_loop()
+        pool = start_download_pool()
+        remaining = time_remaining()
+        wall_deadline = time.time() + remaining if remaining is not None else None
+        
+        async def _download(url: str) -> Dict[str, Any]:
+            async with _get_download_semaphore():
+                future = loop.run_in_executor(
+                    pool, _download_in_worker, url, audio_quality, audio_format, extract_metadata, wall_deadline
+                )
+                return await _run_holding_slot(future)
+        
+        results = await asyncio.gather(*(_download(url) for url in urls), return_exceptions=True)
+        
+        return [
+            result if isinstance(result, dict)
+            else {'success': False, 'error': f"Unexpected error: {str(result)}"}
+            for result in results
+        ]
+    
+    async def get_video_info(self, url: str, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get video info without downloading, from the cache when possible
+        
+        Args:
+            url: YouTube video URL
+            refresh: Skip the cache and extract the info again
+            
+        Returns:
+            Video info payload (see `_build_video_info`)
+            
+        Raises:
+            yt_dlp.utils.DownloadError: If extraction fails
+        """
+        video_id = extract_video_id(url)
+        if video_id and not refresh:
+            cached = metadata_cache.get(video_id)
+            if cached is not None:
+                return cached
+        
+        def _extract() -> Dict[str, Any]:
+            with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
+                return self._build_video_info(ydl.extract_info(url, download=False))
+        
+        loop = asyncio.get_event_loop()
+        info = await loop.run_in_executor(None, _extract)
+        if video_id:
+            metadata_cache.set(video_id, info)
+        return info
+    
+    def _download_audio_sync(
+        self,
+        url: str,
+        audio_quality: int,
+        audio_format: str,
+        extract_metadata: bool,
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Blocking implementation of `download_audio`
+
+        `deadline` is a time.monotonic() value; past it the download is
+        abandoned at the next progress or post-processing step.
+        """
+        file_id = generate_id()
         
         try:
-            # Create temporary directory for this download
-            with tempfile.TemporaryDirectory(dir=self.temp_dir) as temp_download_dir:
+            # Partial files live in a per-download dir under PARTIALS_DIR, beside
+            # OUTPUT_DIR (so never served or listed) and on the same filesystem
+            # so yt-dlp's final move stays a rename.
+            partials_root = settings.PARTIALS_DIR
+            partial_dir = _acquire_partial_dir(partials_root)
+            try:
                 
-                # Configure yt-dlp options
-                output_template = os.path.join(temp_download_dir, f"{file_id}.%(ext)s")
+                # Configure yt-dlp options: download/post-process in partial_dir,
+                # then yt-dlp moves the finished file straight into OUTPUT_DIR
+                output_template = f"{file_id}.%(ext)s"
                 
-                ydl_opts = {
-                    'format': 'bestaudio/best',
+                # 'best' tells FFmpegExtractAudio to keep the source codec
+                preferred_codec = 'best' if audio_format == COPY_AUDIO_FORMAT else audio_format
+                
+                ydl_opts = self._build_ydl_opts({
+                    # Prefer a source in the target codec so extraction is a stream copy
+                    'format': COPY_FRIENDLY_FORMATS.get(audio_format, 'bestaudio/best'),
                     'outtmpl': output_template,
+                    'paths': {'home': str(self.output_dir), 'temp': partial_dir},
                     'extractaudio': True,
-                    'audioformat': audio_format,
+                    'audioformat': preferred_codec,
                     'audioquality': str(audio_quality),
-                    'postprocessors': [{
-                        'key': 'FFmpegExtractAudio',
-                        'preferredcodec': audio_format,
-                        'preferredquality': str(audio_quality),
-                    }],
                     'quiet': True,
                     'no_warnings': True,
                     'socket_timeout': settings.YOUTUBE_DOWNLOAD_TIMEOUT,
                     'fragment_retries': 3,
                     'retries': 3,
-                }
-
-                # Add cookies file if configured
-                if hasattr(settings, 'YOUTUBE_COOKIES_FILE') and settings.YOUTUBE_COOKIES_FILE:
-                    cookies_path = Path(settings.YOUTUBE_COOKIES_FILE)
-                    if cookies_path.exists():
-                        ydl_opts['cookiefile'] = str(cookies_path)
-                    else:
-                        logger.warning(f"Configured cookies file not found: {settings.YOUTUBE_COOKIES_FILE}")
-                        # Try browser cookies as fallback
-                        try:
-                            ydl_opts['cookiesfrombrowser'] = ('firefox', None)
-                        except Exception:
-                            pass
-                else:
-                    # Try to use cookies from browser as fallback
-                    try:
-                        ydl_opts['cookiesfrombrowser'] = ('firefox', None)
-                    except Exception:
-                        pass
+                    # Only the single video: no playlist expansion or side files
+                    'noplaylist': True,
+                    'getcomments': False,
+                    'writeinfojson': False,
+                    'writethumbnail': False,
+                })
+                player_clients = [c.strip() for c in settings.YOUTUBE_PLAYER_CLIENTS.split(',') if c.strip()]
+                if player_clients:
+                    ydl_opts['extractor_args'] = {'youtube': {'player_client': player_clients}}
+                if deadline is not None:
+                    def _check_deadline(_status):
+                        if time.monotonic() > deadline:
+                            raise DownloadCancelled("request deadline exceeded")
+                    ydl_opts['progress_hooks'] = [_check_deadline]
+                    ydl_opts['postprocessor_hooks'] = [_check_deadline]
+                encoder = _pick_audio_encoder(audio_format) if settings.YOUTUBE_PREFER_FAST_ENCODERS else None
                 
-                # Extract info first if metadata is requested
+                # Extract info and download in a single extractor pass
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    if self._cookiejar is not None:
+                        ydl.cookiejar = self._cookiejar
+                    ydl.add_post_processor(FastExtractAudioPP(
+                        ydl,
+                        aac_encoder=encoder,
+                        preferredcodec=preferred_codec,
+                        preferredquality=str(audio_quality),
+                    ), when='post_process')
+                    info = ydl.extract_info(url, download=True)
+                
+                # Metadata comes from the same info dict
                 metadata = None
-                if extract_metadata:
+                if extract_metadata and info:
                     try:
-                        metadata_opts = {'quiet': True}
-                        # Add cookies file if configured
-                        if hasattr(settings, 'YOUTUBE_COOKIES_FILE') and settings.YOUTUBE_COOKIES_FILE:
-                            cookies_path = Path(settings.YOUTUBE_COOKIES_FILE)
-                            if cookies_path.exists():
-                                metadata_opts['cookiefile'] = str(cookies_path)
-                            else:
-                                # Try browser cookies as fallback
-                                try:
-                                    metadata_opts['cookiesfrombrowser'] = ('firefox', None)
-                                except Exception:
-                                    pass
-                        else:
-                            # Try to use cookies from browser as fallback
-                            try:
-                                metadata_opts['cookiesfrombrowser'] = ('firefox', None)
-                            except Exception:
-                                pass
-
-                        with yt_dlp.YoutubeDL(metadata_opts) as ydl:
-                            info = ydl.extract_info(url, download=False)
-                            metadata = self._extract_metadata(info)
+                        metadata = self._extract_metadata(info)
                     except Exception as e:
-                        logger.warning(f"Failed to extract metadata: {e}")
+                        logger.warning("Failed to extract metadata: %s", e)
                 
-                # Download the audio
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([url])
+                # The info dict is already here, so a later /youtube-info for this video is free
+                video_id = extract_video_id(url)
+                if video_id and info:
+                    metadata_cache.set(video_id, self._build_video_info(info))
                 
-                # Find the downloaded file
-                downloaded_file = self._find_downloaded_file(temp_download_dir, file_id)
-                if not downloaded_file:
+                # Locate the post-processed file from the info dict, scanning as a fallback
+                located = self._downloaded_filepath(info)
+                if not located:
+                    located = self._find_downloaded_file(str(self.output_dir), file_id)
+                if not located:
                     raise FileNotFoundError("Downloaded file not found")
+                downloaded_file, file_size = located
                 
-                # Move to output directory with proper filename
-                final_filename = self._generate_filename(metadata, file_id, audio_format)
-                final_path = self.output_dir / final_filename
+                # With "copy" the extension is whatever container the source codec landed in
+                extension = audio_format
+                if audio_format == COPY_AUDIO_FORMAT:
+                    extension = os.path.splitext(downloaded_file)[1].lstrip('.') or 'm4a'
                 
-                # Ensure output directory exists
-                self.output_dir.mkdir(parents=True, exist_ok=True)
-                
-                # Move file to final location (handles cross-device moves)
-                shutil.move(downloaded_file, final_path)
+                # Rename to the title-based filename (same directory, so O(1))
+                final_filename = self._generate_filename(metadata, file_id, extension)
+                final_path = self.output_dir / final_filename
+                _move_file(downloaded_file, final_path)
                 
-                # Get file size
-                file_size_mb = final_path.stat().st_size / (1024 * 1024)
+                # Size was captured when locating the file; renames don't change it
+                file_size_mb = file_size / (1024 * 1024)
                 
                 return {
                     'success': True,
@@ -150,20 +519,58 @@ class YouTubeService:
                     'file_size_mb': round(file_size_mb, 2),
                     'metadata': metadata
                 }
+            finally:
+                _release_partial_dir(partials_root, partial_dir)
                 
+        except DownloadCancelled as e:
+            logger.warning("Download abandoned: %s", e)
+            return {
+                'success': False,
+                'error': f"Download cancelled: {str(e)}"
+            }
         except DownloadError as e:
-            logger.error(f"yt-dlp download error: {e}")
+            logger.error("yt-dlp download error: %s", e)
             return {
                 'success': False,
                 'error': f"Download failed: {str(e)}"
             }
         except Exception as e:
-            logger.error(f"Unexpected error during download: {e}")
+            logger.error("Unexpected error during download: %s", e)
             return {
                 'success': False,
                 'error': f"Unexpected error: {str(e)}"
             }
     
+    def _build_ydl_opts(self, base: Dict[str, Any]) -> Dict[str, Any]:
+        """Add cookie configuration to yt-dlp options"""
+        ydl_opts = dict(base)
+        if self._cookiejar is not None:
+            # The shared jar is attached to the YoutubeDL instance directly
+            return ydl_opts
+        if settings.YOUTUBE_COOKIES_FILE:
+            cookies_path = Path(settings.YOUTUBE_COOKIES_FILE)
+            if cookies_path.exists():
+                ydl_opts['cookiefile'] = str(cookies_path)
+                return ydl_opts
+            logger.warning("Configured cookies file not found: %s", settings.YOUTUBE_COOKIES_FILE)
+        # Try browser cookies as fallback
+        ydl_opts['cookiesfrombrowser'] = ('firefox', None)
+        return ydl_opts
+
+    def _downloaded_filepath(self, info: Optional[Dict[str, Any]]) -> Optional[Tuple[str, int]]:
+        """Return the final (post-processed) file path yt-dlp reports and its size, if it exists"""
+        if not info:
+            return None
+        for download in info.get('requested_downloads') or []:
+            filepath = download.get('filepath')
+            if not filepath:
+                continue
+            try:
+                return filepath, os.stat(filepath).st_size
+            except OSError:
+                continue
+        return None
+
     def _extract_metadata(self, info: Dict[str, Any]) -> VideoMetadata:
         """Extract metadata from yt-dlp info"""
         return VideoMetadata(
@@ -176,11 +583,30 @@ class YouTubeService:
             description=info.get('description', '')[:500] if info.get('description') else None
         )
     
-    def _find_downloaded_file(self, directory: str, file_id: str) -> Optional[str]:
-        """Find the downloaded file in the directory"""
-        for filename in os.listdir(directory):
-            if filename.startswith(file_id):
-                return os.path.join(directory, filename)
+    def _build_video_info(self, info: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the /youtube-info payload from a yt-dlp info dict"""
+        formats = info.get('formats') or []
+        return {
+            "title": info.get('title'),
+            "duration": info.get('duration'),
+            "thumbnail": info.get('thumbnail'),
+            "uploader": info.get('uploader'),
+            "upload_date": info.get('upload_date'),
+            "view_count": info.get('view_count'),
+            "description": info.get('description', '')[:500] if info.get('description') else None,
+            "formats_available": len(formats),
+            "audio_formats": [
+                f for f in formats
+                if f.get('acodec') != 'none' and f.get('vcodec') == 'none'
+            ][:5]  # Show first 5 audio formats
+        }
+    
+    def _find_downloaded_file(self, directory: str, file_id: str) -> Optional[Tuple[str, int]]:
+        """Find the downloaded file in the directory and return it with its size"""
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith(file_id):
+                    return entry.path, entry.stat(follow_symlinks=False).st_size
         return None
     
     def _generate_filename(
@@ -192,7 +618,7 @@ class YouTubeService:
         """Generate a safe filename for the downloaded audio"""
         if metadata and metadata.title:
             # Clean the title for use as filename
-            safe_title = "".join(c for c in metadata.title if c.isalnum() or c in (' ', '-', '_', '.', '(', ')')).strip()
+            safe_title = sanitize_title(metadata.title)
             safe_title = safe_title[:200]  # Increased length limit for full titles
             filename = f"{safe_title}.{audio_format}"
         else:
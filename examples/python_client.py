@@ -2,11 +2,22 @@
 Python client example for Music Tools API
 """
 
-import requests
+import asyncio
+import importlib.util
 import json
 import time
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, List
+
+import httpx
+
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Uploads and separations can run for minutes, so only bound connect/write/pool
+CLIENT_TIMEOUT = httpx.Timeout(60.0, read=None)
+
+# HTTP/2 needs the optional `h2` package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
 
 
 class MusicToolsClient:
@@ -14,17 +25,19 @@ class MusicToolsClient:
     
     def __init__(self, base_url: str = "http://localhost:8001"):
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
+        self.client = httpx.Client(http2=HTTP2_AVAILABLE, timeout=CLIENT_TIMEOUT)
+        # path -> (ETag, JSON body) for endpoints that rarely change
+        self._metadata_cache: Dict[str, Tuple[Optional[str], Dict[str, Any]]] = {}
     
     def health_check(self) -> Dict[str, Any]:
         """Check API health status"""
-        response = self.session.get(f"{self.base_url}/health")
+        response = self.client.get(f"{self.base_url}/health")
         response.raise_for_status()
         return response.json()
     
     def get_youtube_info(self, url: str) -> Dict[str, Any]:
         """Get YouTube video information without downloading"""
-        response = self.session.get(
+        response = self.client.get(
             f"{self.base_url}/api/v1/youtube-info",
             params={"url": url}
         )
@@ -51,7 +64,7 @@ class MusicToolsClient:
             "extract_metadata": extract_metadata
         }
         
-        response = self.session.post(
+        response = self.client.post(
             f"{self.base_url}/api/v1/youtube-to-mp3",
             json=payload
         )
@@ -91,7 +104,7 @@ class MusicToolsClient:
             if stems:
                 data['stems'] = stems
 
-            response = self.session.post(
+            response = self.client.post(
                 f"{self.base_url}/api/v1/separate-stems",
                 files=files,
                 data=data
@@ -100,27 +113,52 @@ class MusicToolsClient:
         response.raise_for_status()
         return response.json()
 
-    def get_available_models(self) -> Dict[str, Any]:
-        """Get available Demucs models"""
-        response = self.session.get(f"{self.base_url}/api/v1/models")
-        response.raise_for_status()
-        return response.json()
+    def _get_cached(self, path: str, refresh: bool = False) -> Dict[str, Any]:
+        """
+        GET a static metadata endpoint at most once per client
+
+        With refresh=True the cached body is revalidated using the
+        previous ETag (if the server sent one), so an unchanged
+        resource costs a 304 with no body.
+        """
+        cached = self._metadata_cache.get(path)
+        if cached and not refresh:
+            return cached[1]
 
-    def get_supported_formats(self) -> Dict[str, Any]:
-        """Get supported output formats"""
-        response = self.session.get(f"{self.base_url}/api/v1/formats")
+        headers = {}
+        if cached and cached[0]:
+            headers['If-None-Match'] = cached[0]
+
+        response = self.client.get(f"{self.base_url}{path}", headers=headers)
+        if cached and response.status_code == 304:
+            return cached[1]
         response.raise_for_status()
-        return response.json()
+
+        data = response.json()
+        self._metadata_cache[path] = (response.headers.get('ETag'), data)
+        return data
+
+    def get_available_models(self, refresh: bool = False) -> Dict[str, Any]:
+        """Get available Demucs models (cached after the first call)"""
+        return self._get_cached("/api/v1/models", refresh)
+
+    def get_supported_formats(self, refresh: bool = False) -> Dict[str, Any]:
+        """Get supported output formats (cached after the first call)"""
+        return self._get_cached("/api/v1/formats", refresh)
     
+    def _stream_to_file(self, path: str, output_path: str) -> bool:
+        """Stream a download to disk in 1 MiB chunks instead of buffering it"""
+        with self.client.stream("GET", f"{self.base_url}{path}") as response:
+            response.raise_for_status()
+            with open(output_path, 'wb') as f:
+                for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+
+        return True
+
     def download_file(self, file_id: str, output_path: str) -> bool:
         """Download a converted audio file"""
-        response = self.session.get(f"{self.base_url}/api/v1/download/{file_id}")
-        response.raise_for_status()
-        
-        with open(output_path, 'wb') as f:
-            f.write(response.content)
-        
-        return True
+        return self._stream_to_file(f"/api/v1/download/{file_id}", output_path)
     
     def download_stem(self, job_id: str, filename: str, output_path: str) -> bool:
         """
@@ -131,41 +169,67 @@ class MusicToolsClient:
             filename: Full filename from API response (e.g., 'Song Title - vocals.mp3')
             output_path: Local path to save the file
         """
-        response = self.session.get(f"{self.base_url}/api/v1/download/{job_id}/{filename}")
-        response.raise_for_status()
-        
-        with open(output_path, 'wb') as f:
-            f.write(response.content)
-        
-        return True
+        return self._stream_to_file(f"/api/v1/download/{job_id}/{filename}", output_path)
     
+    async def download_stems_parallel(
+        self,
+        job_id: str,
+        filenames: List[str],
+        output_dir: str
+    ) -> List[Path]:
+        """
+        Download several stems of one job concurrently
+
+        Over HTTP/2 all transfers share a single connection; otherwise
+        httpx opens one pooled connection per stem.
+
+        Args:
+            job_id: Job ID from stem separation
+            filenames: Filenames from the API response
+            output_dir: Local directory to save the files into
+
+        Returns:
+            Paths of the downloaded files, in the order given
+        """
+        out = Path(output_dir)
+        out.mkdir(parents=True, exist_ok=True)
+
+        async def _download(client: httpx.AsyncClient, filename: str) -> Path:
+            target = out / filename
+            url = f"{self.base_url}/api/v1/download/{job_id}/{filename}"
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+                with open(target, 'wb') as f:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+            return target
+
+        async with httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=CLIENT_TIMEOUT,
+            headers=self.client.headers
+        ) as client:
+            return list(await asyncio.gather(*(_download(client, name) for name in filenames)))
+
+    def close(self) -> None:
+        """Close the underlying HTTP connection pool"""
+        self.client.close()
+
     def get_file_info(self, file_id: str) -> Dict[str, Any]:
         """Get information about a file"""
-        response = self.session.get(f"{self.base_url}/api/v1/download/{file_id}/info")
-        response.raise_for_status()
-        return response.json()
-    
-    def get_available_models(self) -> Dict[str, Any]:
-        """Get available Demucs models"""
-        response = self.session.get(f"{self.base_url}/api/v1/models")
-        response.raise_for_status()
-        return response.json()
-    
-    def get_supported_formats(self) -> Dict[str, Any]:
-        """Get supported output formats"""
-        response = self.session.get(f"{self.base_url}/api/v1/formats")
+        response = self.client.get(f"{self.base_url}/api/v1/download/{file_id}/info")
         response.raise_for_status()
         return response.json()
     
     def get_storage_stats(self) -> Dict[str, Any]:
         """Get storage statistics"""
-        response = self.session.get(f"{self.base_url}/api/v1/stats")
+        response = self.client.get(f"{self.base_url}/api/v1/stats")
         response.raise_for_status()
         return response.json()
     
     def trigger_cleanup(self) -> Dict[str, Any]:
         """Trigger manual cleanup"""
-        response = self.session.post(f"{self.base_url}/api/v1/cleanup")
+        response = self.client.post(f"{self.base_url}/api/v1/cleanup")
         response.raise_for_status()
         return response.json()
 
@@ -245,10 +309,12 @@ def example_usage():
         print(f"Total files: {stats['total_files']}")
         print(f"Total size: {stats['total_size_mb']} MB")
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"API Error: {e}")
     except Exception as e:
         print(f"Error: {e}")
+    finally:
+        client.close()
 
 
 if __name__ == "__main__":
@@ -115,15 +115,16 @@ def test_download_file(file_id):
         return
     
     print(f"Testing file download for ID: {file_id}")
-    response = requests.get(f"{BASE_URL}/api/v1/download/{file_id}")
-    print(f"Status: {response.status_code}")
-    
-    if response.status_code == 200:
-        print(f"Content-Type: {response.headers.get('content-type')}")
-        print(f"Content-Length: {response.headers.get('content-length')} bytes")
-        print("Download successful!")
-    else:
-        print(f"Error: {response.text}")
+    # Only the headers are inspected, so don't pull the body into memory
+    with requests.get(f"{BASE_URL}/api/v1/download/{file_id}", stream=True) as response:
+        print(f"Status: {response.status_code}")
+        
+        if response.status_code == 200:
+            print(f"Content-Type: {response.headers.get('content-type')}")
+            print(f"Content-Length: {response.headers.get('content-length')} bytes")
+            print("Download successful!")
+        else:
+            print(f"Error: {response.text}")
     print()
 
 def test_get_models():
@@ -37,7 +37,7 @@ except ImportError as e:
     sys.exit(1)
 
 try:
-    import main
+    from main import app
     print("✅ Main module import successful")
     print("✅ FastAPI app created successfully")
 except ImportError as e:
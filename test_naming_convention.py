@@ -4,8 +4,12 @@ Test script to verify the new naming convention for MP3 files and stems.
 This is a simplified test that doesn't require the full environment.
 """
 
+import sys
 from typing import Optional
 
+# Stdlib-only, so importable without the service's dependencies
+from app.core.filenames import sanitize_title
+
 
 class MockVideoMetadata:
     """Mock VideoMetadata class for testing"""
@@ -24,7 +28,7 @@ def generate_youtube_filename(metadata: Optional[MockVideoMetadata], file_id: st
     """Mock YouTube filename generation logic"""
     if metadata and metadata.title:
         # Clean the title for use as filename
-        safe_title = "".join(c for c in metadata.title if c.isalnum() or c in (' ', '-', '_', '.', '(', ')')).strip()
+        safe_title = sanitize_title(metadata.title)
         safe_title = safe_title[:200]  # Increased length limit for full titles
         filename = f"{safe_title}.{audio_format}"
     else:
@@ -82,18 +86,18 @@ def test_stem_filename_generation():
 
     # Test with original filename
     original_filename = "Rick Astley - Never Gonna Give You Up (Official Video) (4K Remaster).mp3"
+    base_name = "Rick Astley - Never Gonna Give You Up (Official Video) (4K Remaster)"
     stem_names = ["vocals", "drums", "bass", "other"]
 
-    for stem_name in stem_names:
-        output_filename = generate_stem_filename(original_filename, stem_name, "mp3")
-        expected_filename = f"Rick Astley - Never Gonna Give You Up (Official Video) (4K Remaster) - {stem_name}.mp3"
-
-        print(f"   {stem_name.capitalize()} stem: {output_filename}")
-        print(f"   Expected:        {expected_filename}")
+    expected = {stem: f"{base_name} - {stem}.mp3" for stem in stem_names}
+    actual = {stem: generate_stem_filename(original_filename, stem, "mp3") for stem in stem_names}
 
-        if output_filename != expected_filename:
-            print(f"   ❌ {stem_name} stem filename: FAILED")
-            return False
+    if actual != expected:
+        for stem in stem_names:
+            if actual[stem] != expected[stem]:
+                print(f"   ❌ {stem} stem: got {actual[stem]!r}, expected {expected[stem]!r}")
+        print("   ❌ Stem filename generation: FAILED")
+        return False
 
     print("   ✅ Stem filename generation: PASSED")
     return True
@@ -106,16 +110,15 @@ def test_stem_filename_without_original():
     # Test without original filename (fallback behavior)
     stem_names = ["vocals", "drums", "bass", "other"]
 
-    for stem_name in stem_names:
-        output_filename = generate_stem_filename(None, stem_name, "mp3")
-        expected_filename = f"{stem_name}.mp3"
-
-        print(f"   {stem_name.capitalize()} stem: {output_filename}")
-        print(f"   Expected:        {expected_filename}")
+    expected = {stem: f"{stem}.mp3" for stem in stem_names}
+    actual = {stem: generate_stem_filename(None, stem, "mp3") for stem in stem_names}
 
-        if output_filename != expected_filename:
-            print(f"   ❌ {stem_name} stem filename (fallback): FAILED")
-            return False
+    if actual != expected:
+        for stem in stem_names:
+            if actual[stem] != expected[stem]:
+                print(f"   ❌ {stem} stem: got {actual[stem]!r}, expected {expected[stem]!r}")
+        print("   ❌ Stem filename generation (fallback): FAILED")
+        return False
 
     print("   ✅ Stem filename generation (fallback): PASSED")
     return True
@@ -138,6 +141,17 @@ def test_edge_cases():
 
     filename_special = generate_youtube_filename(metadata_special, "test-id", "mp3")
     print(f"   Special chars: {filename_special}")
+    if filename_special != "Test Song WithSpecialCharacters  More.mp3":
+        print("   ❌ Special character stripping: FAILED")
+        return False
+
+    # Non-ASCII letters are kept; symbols and emoji are dropped
+    metadata_unicode = MockVideoMetadata(title="Beyoncé – Halo ★ 🎵 (Live)")
+    filename_unicode = generate_youtube_filename(metadata_unicode, "test-id", "mp3")
+    print(f"   Unicode title: {filename_unicode}")
+    if filename_unicode != "Beyoncé  Halo   (Live).mp3":
+        print("   ❌ Unicode title sanitization: FAILED")
+        return False
 
     # Test with very long title
     metadata_long = MockVideoMetadata(
@@ -196,4 +210,4 @@ def main():
 
 
 if __name__ == "__main__":
-    exit(main())
+    sys.exit(main())
@@ -3,59 +3,145 @@
 Test script to verify that the stems parameter defaults to all stems when empty or null.
 """
 
-from typing import Optional, List
+import sys
+import functools
+from typing import Optional, Sequence, Tuple
 
+# Mirrors VALID_STEMS / VALID_STEMS_SET / VALID_STEMS_TEXT in app/models/requests.py
+VALID_STEMS = ('vocals', 'drums', 'bass', 'other')
+VALID_STEMS_SET = frozenset(VALID_STEMS)
+VALID_STEMS_TEXT = str(list(VALID_STEMS))
+DEFAULT_STEMS = VALID_STEMS  # What the service separates when no stems are requested
 
-def parse_stems_parameter(stems: Optional[str]) -> Optional[List[str]]:
+
+def invalid_stems_error(stems: Sequence[str]) -> Optional[str]:
+    """
+    Mock implementation of invalid_stems_error (issuperset check, all invalid stems named)
+    """
+    # Happy path: one C-level containment pass, no allocation
+    if VALID_STEMS_SET.issuperset(stems):
+        return None
+    invalid = set(stems).difference(VALID_STEMS_SET)
+    if len(invalid) == 1:
+        return f"Invalid stem '{invalid.pop()}'. Valid stems: {VALID_STEMS_TEXT}"
+    names = ", ".join(f"'{stem}'" for stem in sorted(invalid))
+    return f"Invalid stems {names}. Valid stems: {VALID_STEMS_TEXT}"
+
+
+@functools.lru_cache(maxsize=64)
+def parse_stems_parameter(stems: Optional[str]) -> Optional[Tuple[str, ...]]:
     """
     Mock implementation of the stems parameter parsing logic from the API
     """
-    requested_stems = None
-    valid_stems = ['vocals', 'drums', 'bass', 'other']
-    
-    if stems and stems.strip():  # Check for non-empty string
-        requested_stems = [s.strip() for s in stems.split(',') if s.strip()]
-        for stem in requested_stems:
-            if stem not in valid_stems:
-                raise ValueError(f"Invalid stem '{stem}'. Valid stems: {valid_stems}")
-    
-    # If stems is None, empty string, or only whitespace, requested_stems remains None
+    # If stems is None, empty string, or only whitespace, return None
     # This will default to all stems in the service layer
-    return requested_stems
+    if not stems:
+        return None
+    stripped = stems.strip()
+    if not stripped:
+        return None
+    
+    # split/strip/filter all run in C; empty entries ("a,,b") drop out
+    requested_stems = tuple(filter(None, map(str.strip, stripped.split(','))))
+    if not requested_stems:
+        return None  # Only separators, e.g. ","
+    error = invalid_stems_error(requested_stems)
+    if error:
+        raise ValueError(error)
+    # Validated names are interned so later set/dict lookups match by identity
+    return tuple(map(sys.intern, requested_stems))
 
 
-def process_stems_with_default(requested_stems: Optional[List[str]]) -> List[str]:
+def process_stems_with_default(requested_stems: Optional[Sequence[str]]) -> Sequence[str]:
     """
     Mock implementation of the service layer logic that defaults to all stems
     """
-    available_stems = ['vocals', 'drums', 'bass', 'other']
-    
     # Process requested stems (or all if none specified)
-    stems_to_process = requested_stems if requested_stems else available_stems
-    
-    return stems_to_process
+    return DEFAULT_STEMS if requested_stems is None else requested_stems
+
+
+# Stems parameter cases as parallel columns; row i of each tuple is one case
+_INPUTS = (
+    None,
+    "",
+    "   ",
+    "vocals",
+    "vocals,drums",
+    "vocals, drums, bass",
+    "vocals,drums,bass,other",
+    "vocals,,drums",
+    " vocals , drums ",
+    "vocals,drums",
+    " , ",
+)
+_EXPECTED_PARSED = (
+    None,
+    None,
+    None,
+    ('vocals',),
+    ('vocals', 'drums'),
+    ('vocals', 'drums', 'bass'),
+    ('vocals', 'drums', 'bass', 'other'),
+    ('vocals', 'drums'),
+    ('vocals', 'drums'),
+    ('vocals', 'drums'),
+    None,
+)
+_EXPECTED_PROCESSED = (
+    ('vocals', 'drums', 'bass', 'other'),
+    ('vocals', 'drums', 'bass', 'other'),
+    ('vocals', 'drums', 'bass', 'other'),
+    ('vocals',),
+    ('vocals', 'drums'),
+    ('vocals', 'drums', 'bass'),
+    ('vocals', 'drums', 'bass', 'other'),
+    ('vocals', 'drums'),
+    ('vocals', 'drums'),
+    ('vocals', 'drums'),
+    ('vocals', 'drums', 'bass', 'other'),
+)
+_DESCRIPTIONS = (
+    "None input",
+    "Empty string",
+    "Whitespace only",
+    "Single stem",
+    "Multiple stems",
+    "Multiple stems with spaces",
+    "All stems explicitly",
+    "Empty values in list",
+    "Stems with extra whitespace",
+    "Repeated input (cached)",
+    "Separators only",
+)
+# Pass lines only depend on the case, so render them once
+_PASS_BANNERS = tuple(f"   ✅ Test {i}: {description}" for i, description in enumerate(_DESCRIPTIONS, 1))
+
 
+# Stems values that must be rejected
+_INVALID_INPUTS = (
+    "invalid_stem",
+    "vocals,invalid",
+    "guitar,piano",
+    "vocals,drums,invalid_stem",
+)
 
-def test_stems_parameter_behavior():
+
+def test_stems_parameter_behavior() -> bool:
     """Test various inputs for the stems parameter"""
     print("🧪 Testing stems parameter default behavior...")
     
-    test_cases = [
-        # (input, expected_parsed, expected_processed, description)
-        (None, None, ['vocals', 'drums', 'bass', 'other'], "None input"),
-        ("", None, ['vocals', 'drums', 'bass', 'other'], "Empty string"),
-        ("   ", None, ['vocals', 'drums', 'bass', 'other'], "Whitespace only"),
-        ("vocals", ['vocals'], ['vocals'], "Single stem"),
-        ("vocals,drums", ['vocals', 'drums'], ['vocals', 'drums'], "Multiple stems"),
-        ("vocals, drums, bass", ['vocals', 'drums', 'bass'], ['vocals', 'drums', 'bass'], "Multiple stems with spaces"),
-        ("vocals,drums,bass,other", ['vocals', 'drums', 'bass', 'other'], ['vocals', 'drums', 'bass', 'other'], "All stems explicitly"),
-        ("vocals,,drums", ['vocals', 'drums'], ['vocals', 'drums'], "Empty values in list"),
-        (" vocals , drums ", ['vocals', 'drums'], ['vocals', 'drums'], "Stems with extra whitespace"),
-    ]
+    # zip() would silently drop cases if a column were short
+    column_lengths = {len(_INPUTS), len(_EXPECTED_PARSED), len(_EXPECTED_PROCESSED), len(_DESCRIPTIONS)}
+    if len(column_lengths) != 1:
+        print(f"   ❌ Test case columns differ in length: {sorted(column_lengths)}")
+        return False
     
     all_passed = True
+    out = []  # Written in one go after the loop
     
-    for i, (input_value, expected_parsed, expected_processed, description) in enumerate(test_cases, 1):
+    cases = zip(_INPUTS, _EXPECTED_PARSED, _EXPECTED_PROCESSED, _DESCRIPTIONS)
+    for i, (input_value, expected_parsed, expected_processed, description) in enumerate(cases, 1):
+        input_repr = repr(input_value)
         try:
             # Test parsing
             parsed = parse_stems_parameter(input_value)
@@ -65,46 +151,55 @@ def test_stems_parameter_behavior():
             
             # Check results
             if parsed == expected_parsed and processed == expected_processed:
-                print(f"   ✅ Test {i}: {description}")
-                print(f"      Input: {repr(input_value)}")
-                print(f"      Parsed: {parsed}")
-                print(f"      Processed: {processed}")
+                out.append(_PASS_BANNERS[i - 1])
+                out.append(f"      Input: {input_repr}")
+                out.append(f"      Parsed: {parsed}")
+                out.append(f"      Processed: {processed}")
             else:
-                print(f"   ❌ Test {i}: {description} - FAILED")
-                print(f"      Input: {repr(input_value)}")
-                print(f"      Expected parsed: {expected_parsed}, got: {parsed}")
-                print(f"      Expected processed: {expected_processed}, got: {processed}")
+                out.append(f"   ❌ Test {i}: {description} - FAILED")
+                out.append(f"      Input: {input_repr}")
+                out.append(f"      Expected parsed: {expected_parsed}, got: {parsed}")
+                out.append(f"      Expected processed: {expected_processed}, got: {processed}")
                 all_passed = False
                 
         except Exception as e:
-            print(f"   ❌ Test {i}: {description} - ERROR: {e}")
+            out.append(f"   ❌ Test {i}: {description} - ERROR: {e}")
             all_passed = False
         
-        print()
+        out.append("")
     
+    sys.stdout.write("\n".join(out) + "\n")
     return all_passed
 
 
-def test_invalid_stems():
+def test_invalid_stems() -> bool:
     """Test invalid stem values"""
     print("🧪 Testing invalid stem values...")
     
-    invalid_cases = [
-        "invalid_stem",
-        "vocals,invalid",
-        "guitar,piano",
-        "vocals,drums,invalid_stem"
-    ]
-    
     all_passed = True
     
-    for i, invalid_input in enumerate(invalid_cases, 1):
+    # Every invalid token across the cases, found in one set operation;
+    # guards against a case that is accidentally valid
+    all_tokens = {token.strip() for case in _INVALID_INPUTS for token in case.split(',')}
+    expected_bad = {"invalid_stem", "invalid", "guitar", "piano"}
+    if all_tokens - VALID_STEMS_SET != expected_bad:
+        print(f"   ❌ Invalid cases cover {sorted(all_tokens - VALID_STEMS_SET)}, expected {sorted(expected_bad)}")
+        all_passed = False
+    
+    for i, invalid_input in enumerate(_INVALID_INPUTS, 1):
+        # The error must name every invalid stem in the input
+        bad_tokens = {token.strip() for token in invalid_input.split(',')} - VALID_STEMS_SET
         try:
             parse_stems_parameter(invalid_input)
             print(f"   ❌ Test {i}: Should have failed for '{invalid_input}'")
             all_passed = False
         except ValueError as e:
-            print(f"   ✅ Test {i}: Correctly rejected '{invalid_input}' - {e}")
+            missing = [token for token in bad_tokens if f"'{token}'" not in str(e)]
+            if missing:
+                print(f"   ❌ Test {i}: Error for '{invalid_input}' doesn't name {missing} - {e}")
+                all_passed = False
+            else:
+                print(f"   ✅ Test {i}: Correctly rejected '{invalid_input}' - {e}")
         except Exception as e:
             print(f"   ❌ Test {i}: Unexpected error for '{invalid_input}' - {e}")
             all_passed = False
@@ -112,7 +207,7 @@ def test_invalid_stems():
     return all_passed
 
 
-def main():
+def main() -> int:
     """Run all tests"""
     print("🎛️ Testing Stems Parameter Default Behavior")
     print("=" * 60)
@@ -141,4 +236,4 @@ def main():
 
 
 if __name__ == "__main__":
-    exit(main())
+    sys.exit(main())